@@ -0,0 +1,127 @@
+import numpy as np
+
+from ballots import UNKNOWN, compact_dtype, to_compact, column_scores, election_result
+from electorate_growth import compromise_bury_gains
+
+# Anonymous profiles: distinct ballots with the number of voters casting each.
+# Positional scores, happiness distributions and the strategy searches below only depend on how many
+# voters hold each ballot, so they run once per distinct ballot and are weighted by the counts.
+# A million voters over 5 alternatives collapse to at most 5! = 120 ballot types.
+# Ballots are encoded as integers in base num_alternatives + 2 (entries shifted by -UNKNOWN so the
+# UNRANKED/UNKNOWN sentinels fit), which keeps grouping a single np.unique over int64 codes.
+
+
+def _radix(num_alternatives):
+    return num_alternatives - UNKNOWN
+
+
+def can_encode(num_alternatives):
+    """Whether ballots of this length fit in an int64 code."""
+    return _radix(num_alternatives) ** num_alternatives < 2 ** 63
+
+
+def encode(ballots, num_alternatives):
+    """int64 code of every ballot (rows of `ballots`, shape (k, num_alternatives))."""
+    radix = _radix(num_alternatives)
+    digits = np.asarray(ballots, dtype=np.int64) - UNKNOWN
+    powers = radix ** np.arange(num_alternatives - 1, -1, -1, dtype=np.int64)
+    return digits @ powers
+
+
+def decode(codes, num_alternatives):
+    """Ballots (rows) of the given codes."""
+    radix = _radix(num_alternatives)
+    codes = np.asarray(codes, dtype=np.int64)
+    powers = radix ** np.arange(num_alternatives - 1, -1, -1, dtype=np.int64)
+    digits = (codes[:, np.newaxis] // powers) % radix
+    return (digits + UNKNOWN).astype(compact_dtype(num_alternatives))
+
+
+class AnonymousProfile:
+    """
+    ballots : (num_types, num_alternatives) distinct ballots (compact, best first)
+    counts  : (num_types,) number of voters casting each ballot
+    """
+
+    def __init__(self, ballots, counts, num_alternatives=None):
+        ballots = np.asarray(ballots)
+        self.num_alternatives = ballots.shape[1] if num_alternatives is None else num_alternatives
+        self.ballots = to_compact(ballots, self.num_alternatives)
+        self.counts = np.asarray(counts, dtype=np.int64)
+
+    @classmethod
+    def from_matrix(cls, preference_matrix):
+        """Group the columns of a (num_alternatives, num_voters) matrix by ballot."""
+        num_alternatives = preference_matrix.shape[0]
+        columns = to_compact(preference_matrix, num_alternatives).T
+        if can_encode(num_alternatives):
+            codes, counts = np.unique(encode(columns, num_alternatives), return_counts=True)
+            return cls(decode(codes, num_alternatives), counts, num_alternatives)
+        ballots, counts = np.unique(columns, axis=0, return_counts=True)
+        return cls(ballots, counts, num_alternatives)
+
+    @classmethod
+    def from_codes(cls, codes, counts, num_alternatives):
+        return cls(decode(codes, num_alternatives), counts, num_alternatives)
+
+    @property
+    def codes(self):
+        return encode(self.ballots, self.num_alternatives)
+
+    @property
+    def num_voters(self):
+        return int(self.counts.sum())
+
+    @property
+    def num_types(self):
+        return len(self.counts)
+
+    def to_matrix(self):
+        """(num_alternatives, num_voters) matrix; voters holding the same ballot are adjacent."""
+        return np.repeat(self.ballots, self.counts, axis=0).T
+
+    def per_voter(self, values):
+        """Expand per-type values to one value per voter (in to_matrix order)."""
+        return np.repeat(values, self.counts)
+
+    def contributions(self, voting_scheme):
+        """Score contribution of one voter of each type, shape (num_types, num_alternatives)."""
+        return column_scores(self.ballots.T, voting_scheme, self.num_alternatives)
+
+    def tally(self, voting_scheme):
+        return self.counts @ self.contributions(voting_scheme)
+
+    def run_election(self, voting_scheme):
+        """Election result (ranking, votes) like BTVA.run_non_strategic_election."""
+        return election_result(self.tally(voting_scheme))
+
+    def happinesses(self, happiness_function, election_ranking):
+        """Happiness of one voter of each type."""
+        return np.array([happiness_function(ballot, election_ranking) for ballot in self.ballots])
+
+    def overall_happiness(self, happiness_function, election_ranking):
+        return self.counts @ self.happinesses(happiness_function, election_ranking)
+
+    def strategic_gains(self, voting_scheme, happiness_function):
+        """
+        Relative gain of the best compromise/bury move of one voter of each type (a single voter
+        changing their ballot sees the same totals whichever voter of the type it is).
+        """
+        contributions = self.contributions(voting_scheme)
+        scores = self.counts @ contributions
+        ranking = np.argsort(-scores, kind='stable')
+        return compromise_bury_gains(
+            voting_scheme, self.ballots.T, contributions, scores, happiness_function,
+            self.happinesses(happiness_function, ranking)
+        )
+
+    def risk_statistics(self, voting_scheme, happiness_function):
+        """Count-weighted versions of the risk.py measures over all voters."""
+        gains = self.strategic_gains(voting_scheme, happiness_function)
+        gainers = gains != 0
+        num_gainers = self.counts[gainers].sum()
+        return {
+            'incentive_based_risk': num_gainers / self.num_voters,
+            'average_gain_risk': (self.counts[gainers] @ gains[gainers]) / num_gainers if num_gainers else 0,
+            'max_gain_risk': np.max(gains),
+        }
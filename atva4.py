@@ -8,11 +8,32 @@ from happiness import *
 from risk import *
 from helper_functions import *
 from functools import partial
+from instrumentation import instrumented
 import itertools
+import tracing
+
+
+def format_combination_report(combo, preference_matrix, strategic_preference_matrix, election_result,
+                              new_election_result, happinesses, new_happinesses, change_in_happiness):
+    election_ranking, votes = election_result
+    new_election_ranking, new_votes = new_election_result
+    return "\n".join([
+        f":: voters {', '.join(str(v) for v in combo)} simultaneously voting strategically..",
+        format_side_by_side(preference_matrix, strategic_preference_matrix),
+        "",
+        f"Winner: {election_ranking[0]} -> {new_election_ranking[0]}",
+        f"Election Ranking: {election_ranking} -> {new_election_ranking}",
+        f"Election Scores: {votes} -> {new_votes}",
+        f"Original Happiness:  {happinesses}",
+        f"Strategic Happiness: {new_happinesses}",
+        f"Change In Happiness: {change_in_happiness} %",
+        ""
+    ])
+
 
 # strategic voting by multiple voters at the same time
 class ATVA4(BTVA):
-    def __init__(self, preference_matrix, voting_scheme):
+    def __init__(self, preference_matrix, voting_scheme, stats=None):
         self.num_alternatives, self.num_voters = preference_matrix.shape
         self.voting_scheme = voting_scheme
         self.btva_happiness_functions_dict = {
@@ -28,9 +49,10 @@ class ATVA4(BTVA):
             ),
             'borda': exp_decay_borda_style_happiness
         }
-        super().__init__(preference_matrix, self.btva_happiness_functions_dict[self.voting_scheme])
+        super().__init__(preference_matrix, self.btva_happiness_functions_dict[self.voting_scheme], stats=stats)
 
 
+    @instrumented('concurrent_enumeration')
     def run_potential_concurrent_strategic_elections(self):
         btva_classes_dict = {
             'plurality': BPlurality,
@@ -40,7 +62,7 @@ class ATVA4(BTVA):
         }
 
         # creating a btva to run a strategic election and see which voters want to vote strategically and in what scenarios
-        btva_instance = btva_classes_dict[self.voting_scheme](self.preference_matrix, self.btva_happiness_functions_dict[self.voting_scheme])
+        btva_instance = btva_classes_dict[self.voting_scheme](self.preference_matrix, self.btva_happiness_functions_dict[self.voting_scheme], stats=self.stats)
 
         # Running a non-strategic btva election
         election_result = btva_instance.run_non_strategic_election()
@@ -77,40 +99,37 @@ class ATVA4(BTVA):
             
         print()
 
+        tracer = tracing.get_tracer()
         potential_change_in_happinesses = {voter: {'participated': 0, 'not_participated': 0} for voter in strategic_voters}
         num_combos = 0
         for n in range(2, len(strategic_voters) + 1):
             num_combos += 1
-            print("-" * 40)
-            print(f"{n} voters simultaneous strategical voting")
-            print("-" * 40)
-            print()
+            tracer.debug('concurrent_group_size', "{line}\n{n} voters simultaneous strategical voting\n{line}\n", line="-" * 40, n=n)
             for combo in itertools.combinations(strategic_voters, n):
-                print(f":: voters {', '.join(str(v) for v in combo)} simultaneously voting strategically..")
                 strategic_preference_matrix = np.copy(self.preference_matrix)
                 combo = np.array(combo)
                 new_pref_columns = np.column_stack(
                     [strategic_scenarios[voter]['strategic preference matrix'][:, voter] for voter in combo]
                 )
                 strategic_preference_matrix[:, combo] = new_pref_columns
-                print_side_by_side(self.preference_matrix, strategic_preference_matrix)
-                print()
 
                 # Running a non-strategic btva election
-                new_btva_instance = btva_classes_dict[self.voting_scheme](strategic_preference_matrix, self.btva_happiness_functions_dict[self.voting_scheme])
+                new_btva_instance = btva_classes_dict[self.voting_scheme](strategic_preference_matrix, self.btva_happiness_functions_dict[self.voting_scheme], stats=self.stats)
                 new_election_result = new_btva_instance.run_non_strategic_election()
                 new_election_ranking, new_votes = new_election_result
                 new_happinesses = new_btva_instance.calc_happinesses(new_election_ranking, self.preference_matrix)
                 new_btva_instance.non_strategic_happinesses = new_happinesses
 
-                print(f"Winner: {election_ranking[0]} -> {new_election_ranking[0]}")
-                print(f"Election Ranking: {election_ranking} -> {new_election_ranking}")
-                print(f"Election Scores: {votes} -> {new_votes}")
-                print(f"Original Happiness:  {happinesses}")
-                print(f"Strategic Happiness: {new_happinesses}")
                 change_in_happiness = np.round((new_happinesses - happinesses) * 100/ np.maximum(new_happinesses, happinesses)).astype(int)
-                print(f"Change In Happiness: {change_in_happiness} %")
-                print()
+                # the per-combination report is only rendered when a sink asks for DEBUG events
+                tracer.debug(
+                    'concurrent_combination', format_combination_report,
+                    combo=combo, preference_matrix=self.preference_matrix,
+                    strategic_preference_matrix=strategic_preference_matrix,
+                    election_result=election_result, new_election_result=new_election_result,
+                    happinesses=happinesses, new_happinesses=new_happinesses,
+                    change_in_happiness=change_in_happiness
+                )
 
                 for voter in strategic_voters:
                     if voter in combo:
@@ -130,6 +149,7 @@ class ATVA4(BTVA):
 
         return potential_change_in_happinesses, strategic_scenarios
 
+    @instrumented('concurrent_final')
     def run_final_concurrent_strategic_election(self, potential_change_in_happinesses, strategic_scenarios):
         btva_classes_dict = {
             'plurality': BPlurality,
@@ -155,7 +175,7 @@ class ATVA4(BTVA):
             print(f"The only strategic voter is {strategic_voters[0]}; No concurrent voting.")
         else:
 
-            btva_instance = btva_classes_dict[self.voting_scheme](self.preference_matrix, self.btva_happiness_functions_dict[self.voting_scheme])
+            btva_instance = btva_classes_dict[self.voting_scheme](self.preference_matrix, self.btva_happiness_functions_dict[self.voting_scheme], stats=self.stats)
             election_result = btva_instance.run_non_strategic_election()
             election_ranking, votes = election_result
             happinesses = btva_instance.calc_happinesses(election_ranking)
@@ -175,7 +195,7 @@ class ATVA4(BTVA):
             print()
 
             # Running a non-strategic btva election
-            new_btva_instance = btva_classes_dict[self.voting_scheme](strategic_preference_matrix, self.btva_happiness_functions_dict[self.voting_scheme])        
+            new_btva_instance = btva_classes_dict[self.voting_scheme](strategic_preference_matrix, self.btva_happiness_functions_dict[self.voting_scheme], stats=self.stats)        
             new_election_result = new_btva_instance.run_non_strategic_election()
             new_election_ranking, new_votes = new_election_result
             new_happinesses = new_btva_instance.calc_happinesses(new_election_ranking, self.preference_matrix)
@@ -200,9 +220,13 @@ class ATVA4(BTVA):
         return
 
 
-random_matrix = generate_random_preferences_matrix(5, 8)
+if __name__ == "__main__":
+    # interactive run: show the per-combination reports as well
+    tracing.set_tracer(tracing.Tracer(tracing.ConsoleSink(), tracing.DEBUG))
+
+    random_matrix = generate_random_preferences_matrix(5, 8)
 
-atva4_instance = ATVA4(random_matrix, 'borda')
-potential_change_in_happinesses, strategic_scenarios = atva4_instance.run_potential_concurrent_strategic_elections()
-atva4_instance.run_final_concurrent_strategic_election(potential_change_in_happinesses, strategic_scenarios)
+    atva4_instance = ATVA4(random_matrix, 'borda')
+    potential_change_in_happinesses, strategic_scenarios = atva4_instance.run_potential_concurrent_strategic_elections()
+    atva4_instance.run_final_concurrent_strategic_election(potential_change_in_happinesses, strategic_scenarios)
 
@@ -0,0 +1,293 @@
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import happiness as hpns
+
+# shared modules (ballots, tracing) live in the repository root; appended so the local copies here still win
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from ballots import UNRANKED, to_compact, column_scores
+import tracing
+
+
+## happiness of one voter as measured by BTVA.run_non_strategic_election for each scheme
+def voter_happiness(voting_scheme, voter_preference, election_ranking):
+    if voting_scheme == 'plurality':
+        return hpns.exponential_decay_happiness(voter_preference, election_ranking)
+    elif voting_scheme == 'voting_for_two':
+        return hpns.k_binary_happiness(2, voter_preference, election_ranking)
+    elif voting_scheme == 'anti_plurality':
+        return hpns.binary_happiness(voter_preference, election_ranking, anti_plurality=True)
+    elif voting_scheme == 'borda':
+        return hpns.exp_decay_borda_style_happiness(
+            voter_preference,
+            election_ranking,
+            polarization={'win_fr': 1, 'lose_fr': 0, 'wl_importance': 2})
+    return 0
+
+
+## voter_happiness for many (voter preference, election ranking) pairs at once.
+## preferences and rankings are (..., m) arrays that broadcast against each other; the values match
+## voter_happiness exactly (same exp values, same summation order, same rounding)
+def batch_voter_happiness(voting_scheme, voter_preferences, election_rankings):
+    preferences, rankings = np.broadcast_arrays(np.asarray(voter_preferences), np.asarray(election_rankings))
+    num_alternatives = preferences.shape[-1]
+    winners = rankings[..., :1]
+    if voting_scheme == 'anti_plurality':
+        return (winners[..., 0] != preferences[..., -1]).astype(float)
+    if voting_scheme in ('plurality', 'voting_for_two'):
+        winner_place = np.argmax(preferences == winners, axis=-1)
+        if voting_scheme == 'voting_for_two':
+            return (winner_place < 2).astype(float)
+        exp_table = np.array([math.exp(-place) for place in range(num_alternatives)])
+        return np.around(exp_table[winner_place], decimals=2)
+    if voting_scheme == 'borda':
+        # polarization {'win_fr': 1, 'lose_fr': 0}: every rank counts as a favourite
+        election_positions = np.argsort(rankings, axis=-1)
+        positions = np.take_along_axis(election_positions, preferences.astype(np.intp), axis=-1)
+        exp_table = np.array([math.exp(-exponent) for exponent in range(2 * num_alternatives)])
+        raw_happiness = np.zeros(preferences.shape[:-1])
+        max_possible_happiness = 0
+        for rank in range(num_alternatives):
+            loss_of_rank = np.minimum(rank - positions[..., rank], 0)
+            raw_happiness += exp_table[rank - loss_of_rank]
+            max_possible_happiness += math.exp(-rank)
+        return np.around(raw_happiness / max_possible_happiness, decimals=2)
+    return np.zeros(preferences.shape[:-1])
+
+
+class CounterStrategicDynamics:
+    """
+    Incremental engine behind BTVA_CounterStrategic.run_counter_strategic_voting.
+
+    Instead of building a new BTVA (and rescoring every voter) for each tried ballot, the engine keeps
+    every voter's score contribution and the running score totals. All counter-moves of a round are
+    tried against the same totals, so they are evaluated together as one array of score deltas
+    (candidate contribution minus the voter's current contribution). The baseline (sincere)
+    happiness never changes and is computed once; with `electorate` (a GrowingElectorate of the
+    same profile, e.g. from a num_voters sweep) the sincere totals and happinesses are taken from it.
+
+    A round follows the original rules:
+      plurality      -> every voter currently voting for the round's winner tries swapping their
+                        top two, in voter order; the swap is kept if it changes the winner of the
+                        totals as they stand after the swaps already kept. A round without swaps
+                        ends the dynamics.
+      borda,
+      anti_plurality,
+      voting_for_two -> voters not voting for the winner, who have not moved yet, look for the
+                        bullet, compromise or bury ballot that beats their baseline happiness the
+                        most. The first voter with such a ballot moves, which ends the round.
+
+    scan='restart' starts every best-response round from voter 0, which reproduces the original
+    trajectory. scan='resume' continues after the last voter that moved (wrapping around), which
+    visits voters in a different order and can therefore end in a different state.
+    """
+
+    def __init__(self, voting_scheme, preference_matrix, scan='restart', electorate=None):
+        if scan not in ('restart', 'resume'):
+            raise ValueError(f"Unknown scan mode: {scan}")
+        self.voting_scheme = voting_scheme
+        self.scan = scan
+        self.true_preferences = to_compact(preference_matrix)
+        self.num_alternatives, self.num_voters = self.true_preferences.shape
+        self.ballots = self.true_preferences.copy()
+
+        if electorate is None:
+            self.contributions = column_scores(self.ballots, voting_scheme, self.num_alternatives)
+            self.scores = self.contributions.sum(axis=0)
+            self.baseline_happinesses = self.calc_happinesses(self.ranking())
+        else:
+            # sincere state kept up to date by an electorate_growth.GrowingElectorate holding this profile
+            self.contributions = electorate.contributions.copy()
+            self.scores = electorate.scores.copy()
+            self.baseline_happinesses = electorate.happinesses()
+
+        self.incentives = np.zeros(self.num_voters)
+        self.moved = np.zeros(self.num_voters, dtype=bool)
+        # like BTVA.happinesses: only filled in once a best-response round has been evaluated
+        self.happinesses = np.zeros(self.num_voters)
+        self.rounds = 0
+        self.elapsed_seconds = 0.0
+        self.scan_position = 0
+
+    @property
+    def rounds_per_second(self):
+        return self.rounds / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def ranking(self, scores=None):
+        if scores is None:
+            scores = self.scores
+        return np.argsort(-scores, axis=-1, kind='stable')
+
+    def calc_happinesses(self, election_ranking):
+        return batch_voter_happiness(self.voting_scheme, self.true_preferences.T, election_ranking)
+
+    def set_ballot(self, voter, ballot):
+        contribution = column_scores(ballot, self.voting_scheme, self.num_alternatives)[0]
+        self.scores = self.scores - self.contributions[voter] + contribution
+        self.contributions[voter] = contribution
+        self.ballots[:, voter] = ballot
+
+    def run(self, max_rounds):
+        """Advance until max_rounds rounds are played or a round passes without any move."""
+        start = time.perf_counter()
+        while self.rounds < max_rounds:
+            if not self.step():
+                break
+        self.elapsed_seconds += time.perf_counter() - start
+        return self.incentives
+
+    def run_trajectory(self, max_rounds):
+        """
+        Advance like run(max_rounds) but keep a snapshot (incentives, happinesses) after every round.
+
+        Returns (snapshots, final): snapshots[k] is the state a run limited to k rounds ends in, for
+        every k up to the number of rounds played. If the dynamics stopped early because a round had
+        no moves, `final` is the state every larger limit ends in (that last round also refreshes
+        the happinesses); otherwise `final` is None.
+        """
+        snapshots = [(self.incentives.copy(), self.happinesses.copy())]
+        final = None
+        start = time.perf_counter()
+        while self.rounds < max_rounds:
+            if not self.step():
+                final = (self.incentives.copy(), self.happinesses.copy())
+                break
+            snapshots.append((self.incentives.copy(), self.happinesses.copy()))
+        self.elapsed_seconds += time.perf_counter() - start
+        return snapshots, final
+
+    def step(self):
+        """Play one round; returns False when nobody changed their ballot."""
+        if self.voting_scheme == 'plurality':
+            return self._plurality_round()
+        return self._best_response_round()
+
+    def _plurality_round(self):
+        tracer = tracing.get_tracer()
+        tracer.debug('round_start', "Round {round} of counter-strategic voting:", round=self.rounds + 1)
+        original_winner = self.ranking()[0]
+        round_incentives = np.zeros(self.num_voters)
+
+        # every voter voting for the winner tries a simple counter-move (swap top two positions);
+        # the score deltas of all swaps are computed at once, acceptance stays sequential
+        eligible = np.flatnonzero(self.ballots[0] == original_winner)
+        swapped = self.ballots[:, eligible].copy()
+        swapped[[0, 1]] = swapped[[1, 0]]
+        deltas = column_scores(swapped, self.voting_scheme, self.num_alternatives) - self.contributions[eligible]
+        for index, voter in enumerate(eligible):
+            # first maximum, i.e. the winner of the stable ranking
+            new_winner = np.argmax(self.scores + deltas[index])
+            if new_winner != original_winner:
+                round_incentives[voter] = 1
+                self.set_ballot(voter, swapped[:, index])
+                tracer.debug(
+                    'counter_move', "Voter {voter} counter-changed ballot to: {ballot} resulting in new winner {winner}",
+                    voter=voter, ballot=swapped[:, index], winner=new_winner
+                )
+
+        if np.sum(round_incentives) == 0:
+            return False
+        self.incentives += round_incentives
+        self.rounds += 1
+        return True
+
+    def _candidate_ballots(self, voters, contenders):
+        """
+        Bullet, compromise and bury ballots of every voter, shape (len(voters), 3 * len(contenders), m),
+        in the order they are tried, and a mask of the ones that apply (compromising on the current
+        top or burying the current bottom changes nothing and is skipped).
+        """
+        current = self.ballots[:, voters].T
+        num_contenders = len(contenders)
+        slots = np.arange(self.num_alternatives)
+        # position of every contender in every voter's current (complete) ballot
+        positions = np.argsort(current, axis=1)[:, contenders][:, :, None]
+
+        # --- Bullet Strategy ---
+        bullet = np.full((len(voters), num_contenders, self.num_alternatives), UNRANKED, dtype=current.dtype)
+        bullet[:, :, 0] = contenders
+        # --- Compromise Strategy --- contender moved to the front, the ones above it shift down
+        compromise_index = np.where(slots == 0, positions, np.where(slots <= positions, slots - 1, slots))
+        # --- Bury Strategy --- contender moved to the back, the ones below it shift up
+        bury_index = np.where(slots == self.num_alternatives - 1, positions,
+                              np.where(slots >= positions, slots + 1, slots))
+        current = current[:, None, :]
+        candidates = np.concatenate((
+            bullet,
+            np.take_along_axis(current, compromise_index, axis=2),
+            np.take_along_axis(current, bury_index, axis=2),
+        ), axis=1)
+        applies = np.concatenate((
+            np.ones((len(voters), num_contenders), dtype=bool),
+            positions[:, :, 0] != 0,
+            positions[:, :, 0] != self.num_alternatives - 1,
+        ), axis=1)
+        return candidates, applies
+
+    def _scan_order(self):
+        if self.scan == 'resume':
+            return np.roll(np.arange(self.num_voters), -self.scan_position)
+        return np.arange(self.num_voters)
+
+    def _best_response_round(self):
+        tracer = tracing.get_tracer()
+        election_ranking = self.ranking()
+        current_winner = election_ranking[0]
+        contenders = election_ranking[1:]
+
+        # Eligibility: skip if voter's first candidate is the winner or they've already voted strategically.
+        order = self._scan_order()
+        voters = order[(self.ballots[0, order] != current_winner) & ~self.moved[order]]
+
+        round_changes = False
+        if len(voters) > 0 and len(contenders) > 0:
+            # every eligible voter's moves against the same totals, as one batch of score deltas
+            candidates, applies = self._candidate_ballots(voters, contenders)
+            num_candidates = candidates.shape[1]
+            contributions = column_scores(
+                candidates.reshape(-1, self.num_alternatives).T, self.voting_scheme, self.num_alternatives
+            ).reshape(len(voters), num_candidates, self.num_alternatives)
+            totals = self.scores + (contributions - self.contributions[voters][:, None, :])
+            happinesses = batch_voter_happiness(
+                self.voting_scheme, self.true_preferences[:, voters].T[:, None, :], self.ranking(totals)
+            )
+            happinesses = np.where(applies, happinesses, -np.inf)
+            # highest happiness above the baseline, first one wins ties
+            best = np.argmax(happinesses, axis=1)
+            improving = happinesses[np.arange(len(voters)), best] > self.baseline_happinesses[voters]
+            if improving.any():
+                index = np.argmax(improving)
+                voter = voters[index]
+                best_ballot = candidates[index, best[index]]
+                self.set_ballot(voter, best_ballot)
+                self.moved[voter] = True
+                self.incentives[voter] = 1
+                self.scan_position = (voter + 1) % self.num_voters
+                self.rounds += 1
+                round_changes = True
+
+        round_ranking = self.ranking()
+        self.happinesses = self.calc_happinesses(round_ranking)
+        if round_changes:
+            tracer.debug(
+                'strategic_move',
+                "Voter {voter} strategic vote changed ballot to: {ballot}, new winner: {winner}\n"
+                "END OF THE ROUND happinesses: {happinesses}\n"
+                "Overall happinesses: {overall}",
+                voter=voter, ballot=best_ballot, winner=round_ranking[0], happinesses=self.happinesses,
+                overall=np.sum(self.happinesses) / self.num_voters
+            )
+        if tracer.enabled_for(tracing.DEBUG):
+            tracer.debug(
+                'round_end',
+                "Preference matrix after this round:\n{matrix}\n"
+                "New result END OF THE ROUND: {ranking}\n"
+                "New winner after this round: {winner}\n\n",
+                matrix=self.ballots.copy(), ranking=round_ranking, winner=round_ranking[0]
+            )
+        if not round_changes:
+            tracer.debug('no_changes', "No voters changed their ballots in this round.\n\n")
+        return round_changes
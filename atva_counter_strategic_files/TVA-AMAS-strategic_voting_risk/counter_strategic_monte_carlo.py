@@ -0,0 +1,130 @@
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+# shared modules (tracing, results_sink, profiles) live in the repository root; appended so the local copies here still win
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from counter_strategic_dynamics import CounterStrategicDynamics
+import tracing
+from results_sink import ResultsSink
+from profiles import impartial_culture
+
+###############################################################################
+# Monte Carlo harness for counter-strategic dynamics
+###############################################################################
+# Every trial draws its own random profile from an independent RNG stream (spawned from one
+# SeedSequence), so results are reproducible for a given seed regardless of how trials are
+# distributed over worker processes.
+
+
+def run_trial(voting_scheme, num_voters, num_alternatives, max_rounds, seed_sequence):
+    """One independent trajectory; returns (strategic_voting_risk, overall_happiness)."""
+    rng = np.random.default_rng(seed_sequence)
+    preference_matrix = impartial_culture(num_alternatives, num_voters, rng=rng)
+    dynamics = CounterStrategicDynamics(voting_scheme, preference_matrix)
+    with tracing.quiet():
+        incentives = dynamics.run(max_rounds)
+    # 'count_strategic_votes' risk, as in strategic_voting_risk.get_strategic_voting_risk
+    risk = np.sum(incentives) / num_voters
+    overall_happiness = np.sum(dynamics.happinesses) / num_voters
+    return risk, overall_happiness
+
+
+def _run_cell(task):
+    voting_scheme, num_voters, num_alternatives, max_rounds, seed_sequences = task
+    return np.array([
+        run_trial(voting_scheme, num_voters, num_alternatives, max_rounds, seed_sequence)
+        for seed_sequence in seed_sequences
+    ]).reshape(-1, 2)
+
+
+def summarize(samples, confidence=0.95):
+    """Mean, standard deviation and normal-approximation confidence interval of the sample mean."""
+    samples = np.asarray(samples, dtype=float)
+    num_trials = len(samples)
+    mean = np.mean(samples)
+    std = np.std(samples, ddof=1) if num_trials > 1 else 0.0
+    half_width = NormalDist().inv_cdf(0.5 + confidence / 2) * std / np.sqrt(num_trials)
+    return {'mean': mean, 'std': std, 'ci_low': mean - half_width, 'ci_high': mean + half_width}
+
+
+def run_monte_carlo(voting_scheme, num_voters_list, num_alternatives_list, num_trials=1000, max_rounds=15,
+                    seed=0, processes=None, trials_per_task=50, confidence=0.95):
+    """
+    Run num_trials independent trajectories for every (num_voters, num_alternatives) pair in a
+    process pool and aggregate risk and happiness with confidence intervals.
+    Returns one dict per grid cell.
+    """
+    grid = list(itertools.product(num_voters_list, num_alternatives_list))
+    cell_seeds = np.random.SeedSequence(seed).spawn(len(grid))
+
+    tasks = []
+    for cell, ((num_voters, num_alternatives), cell_seed) in enumerate(zip(grid, cell_seeds)):
+        trial_seeds = cell_seed.spawn(num_trials)
+        for start in range(0, num_trials, trials_per_task):
+            tasks.append((cell, (voting_scheme, num_voters, num_alternatives, max_rounds,
+                                 trial_seeds[start:start + trials_per_task])))
+
+    samples = [[] for _ in grid]
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count()) as executor:
+        for (cell, _), block in zip(tasks, executor.map(_run_cell, [task for _, task in tasks])):
+            samples[cell].append(block)
+
+    rows = []
+    for (num_voters, num_alternatives), blocks in zip(grid, samples):
+        values = np.vstack(blocks)
+        risk = summarize(values[:, 0], confidence)
+        happiness = summarize(values[:, 1], confidence)
+        rows.append({
+            'voting_scheme': voting_scheme,
+            'num_voters': num_voters,
+            'num_alternatives': num_alternatives,
+            'max_rounds': max_rounds,
+            'num_trials': len(values),
+            **{f'strategic_voting_risk_{key}': value for key, value in risk.items()},
+            **{f'overall_happiness_{key}': value for key, value in happiness.items()},
+        })
+    return rows
+
+
+def plot_curves(rows, x='num_voters'):
+    """Risk and happiness against `x` with confidence bands, one line per value of the other size."""
+    other = 'num_alternatives' if x == 'num_voters' else 'num_voters'
+    plt.figure(figsize=(10, 6))
+    for other_value in sorted({row[other] for row in rows}):
+        selected = sorted((row for row in rows if row[other] == other_value), key=lambda row: row[x])
+        xs = [row[x] for row in selected]
+        for metric, marker in (('strategic_voting_risk', 'o'), ('overall_happiness', 's')):
+            means = [row[f'{metric}_mean'] for row in selected]
+            plt.plot(xs, means, marker=marker, label=f"{metric.replace('_', ' ').title()} ({other}={other_value})")
+            plt.fill_between(xs, [row[f'{metric}_ci_low'] for row in selected],
+                             [row[f'{metric}_ci_high'] for row in selected], alpha=0.2)
+    plt.xlabel(x.replace('_', ' ').title())
+    plt.ylabel("Value")
+    plt.title(f"Counter-Strategic Voting ({rows[0]['voting_scheme']}, max rounds = {rows[0]['max_rounds']}, "
+              f"{rows[0]['num_trials']} trials per point)")
+    plt.legend()
+    plt.grid(True)
+    plt.show()
+
+
+if __name__ == "__main__":
+    num_voters_list = [2, 3, 4, 5, 6, 7, 8, 9, 10, 12, 15, 20, 25, 30, 40, 50]
+    num_alternatives_list = [6]
+
+    rows = run_monte_carlo('borda', num_voters_list, num_alternatives_list, num_trials=1000, max_rounds=15, seed=0)
+    for row in rows:
+        print(f"voters={row['num_voters']:<4} alternatives={row['num_alternatives']:<4} "
+              f"risk={row['strategic_voting_risk_mean']:.3f} "
+              f"[{row['strategic_voting_risk_ci_low']:.3f}, {row['strategic_voting_risk_ci_high']:.3f}]  "
+              f"happiness={row['overall_happiness_mean']:.3f} "
+              f"[{row['overall_happiness_ci_low']:.3f}, {row['overall_happiness_ci_high']:.3f}]")
+    with ResultsSink("monte_carlo_results.csv", list(rows[0]), metadata={'seed': 0}) as sink:
+        for row in rows:
+            sink.write(**row)
+    plot_curves(rows, x='num_voters')
@@ -1,8 +1,12 @@
-import pandas as pd
+import os
+import sys
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from results_sink import load_results
+
 # Read the CSV file
-df = pd.read_csv("results.csv")
+df = load_results("results.csv")
 
 # Extract columns
 rounds = df["max_rounds"]
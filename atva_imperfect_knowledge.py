@@ -2,101 +2,158 @@ import numpy as np
 import itertools
 import happiness as hpns
 import risk as svr
-from b_main import generate_random_preferences_matrix
+import tracing
+from ballots import UNKNOWN, UNRANKED, to_compact, column_scores, missing_alternatives
+from helper_functions import generate_random_preferences_matrix
+from instrumentation import instrumented
+from election_cache import cached_tally
+
+# expected improvements are averages of floats; gains below this are rounding noise, not an incentive
+GAIN_TOLERANCE = 1e-12
 
 class BTVA:
-    def __init__(self, voting_scheme, preference_matrix, original_preference_matrix):
+    # instrumentation.Stats collecting counters and phase times, None (off) by default
+    stats = None
+
+    def __init__(self, voting_scheme, preference_matrix, original_preference_matrix, stats=None):
         """
         voting_scheme : str
             E.g. 'plurality' or 'borda'
         preference_matrix : np.ndarray
             The matrix actually used for the election (shape = (num_alternatives, num_voters)).
+            Stored as compact ballots (see ballots.py); NaN entries become UNKNOWN.
         original_preference_matrix : np.ndarray
             The fully known "true" preference matrix (for computing happiness).
+        stats : instrumentation.Stats, optional
+            Collects counters and phase timings when given.
         """
         self.voting_scheme = voting_scheme
-        self.preference_matrix = preference_matrix
         self.num_alternatives, self.num_voters = preference_matrix.shape
+        self.preference_matrix = to_compact(preference_matrix, self.num_alternatives)
         self.risk_of_strategic_voting = 0
         self.happinesses = np.zeros(self.num_voters)
         self.svr_scheme = 'count_strategic_votes'
         self.original_preference_matrix = original_preference_matrix
+        self.stats = stats
 
+    @instrumented('election', 'elections')
     def run_non_strategic_election(self):
         """
         Run the election based on self.preference_matrix,
         then compute self.happinesses for each voter using the original_preference_matrix.
         Returns a 2-row array [ [ranking of alts], [their scores or votes] ].
         """
-        scores = np.zeros(self.num_alternatives)
+        # unknown (-2) and unranked (-1) slots are skipped by tally, no float/NaN handling needed
+        scores = cached_tally(self.preference_matrix, self.voting_scheme, self.num_alternatives, self.stats)
+        election_ranking = np.argsort(-scores, kind='stable')
+        votes = np.sort(-scores, kind='stable').astype(int) * (-1)
 
-        if self.voting_scheme == 'plurality':
-            for voter in range(self.num_voters):
-                top_choice = self.preference_matrix[0, voter]
-                if np.isnan(top_choice):
-                    continue
-                scores[int(top_choice)] += 1
-            election_ranking = np.argsort(-scores, kind='stable')
-            votes = np.sort(-scores, kind='stable').astype(int) * (-1)
-            
-            for voter in range(self.num_voters):
-                self.happinesses[voter] = hpns.exponential_decay_happiness(
-                    self.original_preference_matrix[:, voter],
-                    election_ranking
-                )
+        for voter in range(self.num_voters):
+            self.happinesses[voter] = self._happiness(self.original_preference_matrix[:, voter], election_ranking)
 
-        elif self.voting_scheme == 'borda':
-            for voter in range(self.num_voters):
-                for rank, choice in enumerate(self.preference_matrix[:, voter]):
-                    if 0 <= choice < self.num_alternatives:
-                        scores[int(choice)] += (self.num_alternatives - rank - 1)
-            election_ranking = np.argsort(-scores, kind='stable')
-            votes = np.sort(-scores, kind='stable').astype(int) * (-1)
-
-            for voter in range(self.num_voters):
-                self.happinesses[voter] = hpns.exp_decay_borda_style_happiness(
-                    self.original_preference_matrix[:, voter],
-                    election_ranking,
-                    polarization={'win_fr': 0.2, 'lose_fr': 0.2, 'wl_importance': 2}
-                )
+        election_result = np.vstack((election_ranking, votes))
+        return election_result
 
+    def _happiness(self, voter_preference, election_ranking):
+        if self.voting_scheme == 'plurality':
+            return hpns.exponential_decay_happiness(voter_preference, election_ranking)
+        elif self.voting_scheme == 'borda':
+            return hpns.exp_decay_borda_style_happiness(
+                voter_preference,
+                election_ranking,
+                polarization={'win_fr': 0.2, 'lose_fr': 0.2, 'wl_importance': 2}
+            )
         elif self.voting_scheme == 'anti_plurality':
-            scores = np.full(self.num_alternatives, self.num_voters)
-            for voter in range(self.num_voters):
-                last_choice = self.preference_matrix[-1, voter]
-                if not np.isnan(last_choice):
-                    scores[int(last_choice)] -= 1
-            election_ranking = np.argsort(-scores, kind='stable')
-            votes = np.sort(-scores, kind='stable').astype(int) * (-1)
-
-            for voter in range(self.num_voters):
-                self.happinesses[voter] = hpns.binary_happiness(
-                    self.original_preference_matrix[:, voter],
-                    election_ranking,
-                    anti_plurality=True
-                )
-
+            return hpns.binary_happiness(voter_preference, election_ranking, anti_plurality=True)
         elif self.voting_scheme == 'voting_for_two':
-            scores = np.zeros(self.num_alternatives)
-            for voter in range(self.num_voters):
-                top_two = self.preference_matrix[:2, voter]
-                for choice in top_two:
-                    if not np.isnan(choice):
-                        scores[int(choice)] += 1
-            election_ranking = np.argsort(-scores, kind='stable')
-            votes = np.sort(-scores, kind='stable').astype(int) * (-1)
-
-       
-            for voter in range(self.num_voters):
-                self.happinesses[voter] = hpns.k_binary_happiness(
-                    2,
-                    self.original_preference_matrix[:, voter],
-                    election_ranking
-                )
+            return hpns.k_binary_happiness(2, voter_preference, election_ranking)
 
-        
-        election_result = np.vstack((election_ranking, votes))
-        return election_result
+
+###############################
+# Hidden entries and column completions
+###############################
+def hiding_order(num_alternatives, num_voters, strategic_voter_idx, rng=np.random):
+    """
+    Random order in which the entries of a profile get hidden.
+
+    Parameters
+    ----------
+    num_alternatives, num_voters : int
+        Shape of the preference matrix.
+    strategic_voter_idx : int
+        The strategic voter's column is never hidden (they know their own preferences).
+    rng : np.random.Generator or module
+        Anything with a shuffle method; the global np.random state by default.
+
+    Returns
+    -------
+    np.ndarray
+        (row, column) positions, shape (num_alternatives * (num_voters - 1), 2). Hiding a prefix
+        of it gives nested masks for increasing noise levels.
+    """
+    # We exclude the strategic voter's column from the random selection
+    mask = np.ones((num_alternatives, num_voters), dtype=bool)
+    mask[:, strategic_voter_idx] = False  # don't hide entries in strategic voter's column
+    candidate_positions = np.argwhere(mask)
+    rng.shuffle(candidate_positions)
+    return candidate_positions
+
+
+class ColumnCache:
+    """
+    Completions of partially known columns and their score contributions, keyed by the column
+    content. A column that looks the same in two partial matrices (the same entries hidden) is
+    completed and scored once, e.g. across the nested masks of a noise sweep.
+    """
+
+    def __init__(self):
+        self.completions = {}
+        self.contributions = {}
+        self.hits = 0
+        self.misses = 0
+
+    def column_completions(self, col, num_alternatives):
+        """All ways to fill the unknown entries of a single column (a list with one element if fully known)."""
+        key = col.tobytes()
+        self._count(key in self.completions)
+        return self._completions(key, col, num_alternatives)
+
+    def column_contributions(self, col, voting_scheme, num_alternatives):
+        """Score contribution of every completion of the column, shape (num_completions, num_alternatives)."""
+        key = (voting_scheme, col.tobytes())
+        contributions = self.contributions.get(key)
+        self._count(contributions is not None)
+        if contributions is None:
+            completions = self._completions(col.tobytes(), col, num_alternatives)
+            contributions = column_scores(np.column_stack(completions), voting_scheme, num_alternatives)
+            self.contributions[key] = contributions
+        return contributions
+
+    def _count(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def _completions(self, key, col, num_alternatives):
+        completions = self.completions.get(key)
+        if completions is not None:
+            return completions
+
+        unknown_positions = np.flatnonzero(col == UNKNOWN)
+        if len(unknown_positions) == 0:
+            # Already fully known
+            completions = [col.copy()]
+        else:
+            missing_candidates = missing_alternatives(col, num_alternatives)
+            completions = []
+            # Permute the missing candidates among the unknown slots
+            for perm in itertools.permutations(missing_candidates):
+                candidate_col = col.copy()
+                candidate_col[unknown_positions] = perm
+                completions.append(candidate_col)
+        self.completions[key] = completions
+        return completions
 
 
 ###############################
@@ -106,14 +163,15 @@ class BTVA_ImperfectInfo(BTVA):
     """
     Single-round Imperfect (or Incomplete) Information ATVA.
 
-    1) Randomly replaces some fraction of entries in the original preference matrix with NaN.
+    1) Randomly hides some fraction of entries in the original preference matrix (marked UNKNOWN).
     2) Runs a normal, non-strategic election (on the partial matrix).
-    3) If we call run_strategic_voting, enumerates all possible ways to fill the NaNs,
+    3) If we call run_strategic_voting, enumerates all possible ways to fill the unknown entries,
        checks strategic moves (Bullet, Compromise, Bury) for the strategic voter,
        and identifies which yields the greatest average improvement in happiness.
     """
 
-    def __init__(self, voting_scheme, original_pref_matrix, noise_level=0.2, strategic_voter_idx=1):
+    def __init__(self, voting_scheme, original_pref_matrix, noise_level=0.2, strategic_voter_idx=1, rng=None,
+                 partial_pref_matrix=None, hiding_order=None, column_cache=None, stats=None):
         """
         Parameters
         ----------
@@ -123,25 +181,45 @@ class BTVA_ImperfectInfo(BTVA):
             The full, "true" preference matrix of shape (num_alternatives, num_voters).
             This is used for measuring happiness and also as our source for partial matrix generation.
         noise_level : float (0 to 1)
-            Fraction of known entries to replace with NaN randomly, simulating incomplete knowledge.
+            Fraction of known entries to hide (mark UNKNOWN) randomly, simulating incomplete knowledge.
         strategic_voter_idx : int
             The index of the voter who may vote strategically.
+        rng : np.random.Generator or int, optional
+            Source of randomness for hiding entries (a Generator or a seed).
+            Defaults to the global np.random state.
+        partial_pref_matrix : np.ndarray, optional
+            Use this partial matrix (UNKNOWN marking hidden entries) instead of hiding entries at
+            random, e.g. to evaluate several schemes on the same incomplete profile.
+        hiding_order : np.ndarray, optional
+            (row, column) positions in the order they get hidden, as returned by hiding_order().
+            The first noise_level fraction is hidden, so instances sharing an order have nested
+            masks: a higher noise level hides a superset of the entries of a lower one.
+        column_cache : ColumnCache, optional
+            Cache of column completions and score contributions to share with other instances on
+            the same profile (e.g. the noise levels of a nested sweep). A private one by default.
+        stats : instrumentation.Stats, optional
+            Collects counters and phase timings when given.
         """
-        # Store the original as given
-        self.original_full_matrix = original_pref_matrix.copy()
-        self.num_alternatives, self.num_voters = self.original_full_matrix.shape
+        # Store the original as compact ballots
+        self.num_alternatives, self.num_voters = original_pref_matrix.shape
+        self.original_full_matrix = to_compact(original_pref_matrix, self.num_alternatives).copy()
         self.strategic_voter_idx = strategic_voter_idx
+        self.rng = np.random if rng is None else np.random.default_rng(rng)
+        self.hiding_order = hiding_order
+        self.column_cache = ColumnCache() if column_cache is None else column_cache
 
-        # Create a partial preference matrix by introducing NaNs
-        partial_pref_matrix = self._randomly_introduce_nans(
-            self.original_full_matrix, 
-            noise_level=noise_level
-        )
+        # Create a partial preference matrix by hiding entries
+        if partial_pref_matrix is None:
+            partial_pref_matrix = self._randomly_introduce_nans(
+                self.original_full_matrix, 
+                noise_level=noise_level
+            )
 
         super().__init__(
             voting_scheme=voting_scheme,
             preference_matrix=partial_pref_matrix,
-            original_preference_matrix=self.original_full_matrix
+            original_preference_matrix=self.original_full_matrix,
+            stats=stats
         )
 
         
@@ -149,28 +227,25 @@ class BTVA_ImperfectInfo(BTVA):
 
     def _randomly_introduce_nans(self, full_matrix, noise_level=0.2):
         """
-        Randomly replace approximately noise_level fraction of entries with NaN.
-        We do not replace the strategic voter's column with NaNs (assuming the
+        Randomly mark approximately noise_level fraction of entries as UNKNOWN.
+        We do not hide the strategic voter's column (assuming the
         strategic voter knows their own preferences).
+        The ballots stay compact integers; no float/NaN copy of the profile is made.
         """
-        partial = full_matrix.astype(float).copy()
+        partial = full_matrix.copy()
         num_alts, num_voters = full_matrix.shape
-        total_entries = num_alts * num_voters
 
-        # We exclude the strategic voter's column from the random selection
-        mask = np.ones((num_alts, num_voters), dtype=bool)
-        mask[:, self.strategic_voter_idx] = False  # don't introduce NaNs in strategic voter's column
-        candidate_positions = np.argwhere(mask)
+        candidate_positions = self.hiding_order
+        if candidate_positions is None:
+            candidate_positions = hiding_order(num_alts, num_voters, self.strategic_voter_idx, self.rng)
 
-        # Number of entries to set to NaN
+        # Number of entries to hide
         n_nan = int(noise_level * candidate_positions.shape[0])
 
-        # Shuffle candidate_positions and pick the first n_nan
-        np.random.shuffle(candidate_positions)
+        # Pick the first n_nan of the shuffled candidate_positions
         positions_to_nan = candidate_positions[:n_nan]
 
-        for (r, c) in positions_to_nan:
-            partial[r, c] = np.nan
+        partial[positions_to_nan[:, 0], positions_to_nan[:, 1]] = UNKNOWN
 
         return partial
 
@@ -184,74 +259,46 @@ class BTVA_ImperfectInfo(BTVA):
         Returns an array 'imperfect_incentives' of length num_voters that has 1 if a voter
         ended up using a strategic ballot, else 0.
         """
-        print("\n=== Imperfect Information: Single-Round Strategic Analysis ===")
-        print("Initial partial preference matrix (with NaNs):")
-        print(self.partial_preference_matrix)
+        tracer = tracing.get_tracer()
+        tracer.info(
+            'partial_matrix',
+            "\n=== Imperfect Information: Single-Round Strategic Analysis ===\n"
+            "Initial partial preference matrix (with {unknown} marking unknown entries):\n{matrix}",
+            unknown=UNKNOWN, matrix=self.partial_preference_matrix
+        )
 
-    
         partial_filled = self._fill_single_missing_candidates(self.partial_preference_matrix)
-        print("\nAfter filling rows with exactly one missing candidate:")
-        print(partial_filled)
+        tracer.info('filled_matrix', "\nAfter filling rows with exactly one missing candidate:\n{matrix}", matrix=partial_filled)
 
-        possible_completions = self._generate_all_completions(partial_filled)
-        print(f"\nTotal possible completions: {len(possible_completions)}")
-
-        # We'll accumulate total happiness for each strategy
-        sum_sincere = 0.0
-        sum_bullet = 0.0
-        sum_compromise = 0.0
-        sum_bury = 0.0
+        # score totals of the other voters in every completion, from the cached column contributions
+        others_scores = self._scenario_scores(partial_filled, exclude_voter=self.strategic_voter_idx)
+        n_scenarios = len(others_scores)
+        tracer.info('completions', "\nTotal possible completions: {count}", count=n_scenarios)
 
         # The strategic voter knows their own (true) preference from original_full_matrix
         # column = strategic_voter_idx
         strategic_sincere_ballot = self.original_full_matrix[:, self.strategic_voter_idx]
 
-        sincere_values = []
-        bullet_values = []
-        compromise_values = []
-        bury_values = []
-
-        for i, completed_matrix in enumerate(possible_completions):
-            print(len(possible_completions))
-            print(f"\n--- Completion Scenario #{i+1} ---\n", completed_matrix)
-
-            # Insert the strategic voter's sincere ballot
-            scenario_sincere = completed_matrix.copy()
-            scenario_sincere[:, self.strategic_voter_idx] = strategic_sincere_ballot
-
-            # Evaluate the sincere scenario
-            sincere_btva = BTVA(self.voting_scheme, scenario_sincere, self.original_full_matrix)
-            result_sincere = sincere_btva.run_non_strategic_election()
-            winner_sincere = result_sincere[0, 0]
-            hvoter_sincere = sincere_btva.happinesses[self.strategic_voter_idx]
-            sincere_values.append(hvoter_sincere)
-            sum_sincere += hvoter_sincere
-            print(f"Sincere scenario winner: {winner_sincere}, Strategic voter happiness: {hvoter_sincere}")
-
-            # Evaluate bullet, compromise, bury
-            bullet_h = self._apply_bullet_voting_and_evaluate(completed_matrix, strategic_sincere_ballot)
-            bullet_values.append(bullet_h)
-
-            compromise_h = self._apply_compromise_voting_and_evaluate(completed_matrix, strategic_sincere_ballot)
-            compromise_values.append(compromise_h)
-
-            bury_h = self._apply_bury_voting_and_evaluate(completed_matrix, strategic_sincere_ballot)
-            bury_values.append(bury_h)
-
-            sum_bullet += bullet_h
-            sum_compromise += compromise_h
-            sum_bury += bury_h
+        # happiness of the strategic voter in every completion (best ballot of each strategy)
+        sincere_values = self._voter_happiness_over(self.strategic_voter_idx, others_scores, [strategic_sincere_ballot])
+        bullet_values = self._voter_happiness_over(self.strategic_voter_idx, others_scores, self._bullet_ballots(strategic_sincere_ballot))
+        compromise_values = self._voter_happiness_over(self.strategic_voter_idx, others_scores, self._compromise_ballots(strategic_sincere_ballot))
+        bury_values = self._voter_happiness_over(self.strategic_voter_idx, others_scores, self._bury_ballots(strategic_sincere_ballot))
+
+        if tracer.enabled_for(tracing.DEBUG):
+            sincere_contribution = column_scores(strategic_sincere_ballot, self.voting_scheme, self.num_alternatives)[0]
+            for i, completed_matrix in enumerate(self._generate_all_completions(partial_filled)):
+                tracer.debug('completion_scenario', "\n--- Completion Scenario #{index} ---\n {matrix}", index=i + 1, matrix=completed_matrix)
+                winner_sincere = np.argsort(-(others_scores[i] + sincere_contribution), kind='stable')[0]
+                tracer.debug(
+                    'sincere_scenario', "Sincere scenario winner: {winner}, Strategic voter happiness: {happiness}",
+                    winner=winner_sincere, happiness=sincere_values[i]
+                )
 
-        n_scenarios = len(possible_completions)
         if n_scenarios == 0:
-            print("No valid completions found (check data).")
+            tracer.warning('no_completions', "No valid completions found (check data).")
             # Return no strategic moves
             return np.zeros(self.num_voters)
-        
-        sincere_values = np.array(sincere_values)
-        bullet_values = np.array(bullet_values)
-        compromise_values = np.array(compromise_values)
-        bury_values = np.array(bury_values)
 
         avg_sincere = np.mean(sincere_values)
         avg_bullet = np.mean(bullet_values)
@@ -262,11 +309,16 @@ class BTVA_ImperfectInfo(BTVA):
         imp_compromise = avg_compromise - avg_sincere
         imp_bury = avg_bury - avg_sincere
 
-        print("\n=== Average Strategic Outcomes (Single Round) ===")
-        print(f"Sincere:         {avg_sincere:.3f}")
-        print(f"Bullet:          {avg_bullet:.3f} (improvement {imp_bullet:.3f})")
-        print(f"Compromise:      {avg_compromise:.3f} (improvement {imp_compromise:.3f})")
-        print(f"Bury:            {avg_bury:.3f} (improvement {imp_bury:.3f})")
+        tracer.info(
+            'average_outcomes',
+            "\n=== Average Strategic Outcomes (Single Round) ===\n"
+            "Sincere:         {sincere:.3f}\n"
+            "Bullet:          {bullet:.3f} (improvement {imp_bullet:.3f})\n"
+            "Compromise:      {compromise:.3f} (improvement {imp_compromise:.3f})\n"
+            "Bury:            {bury:.3f} (improvement {imp_bury:.3f})",
+            sincere=avg_sincere, bullet=avg_bullet, compromise=avg_compromise, bury=avg_bury,
+            imp_bullet=imp_bullet, imp_compromise=imp_compromise, imp_bury=imp_bury
+        )
 
         # Pick the largest positive improvement
         strategies = {
@@ -278,15 +330,18 @@ class BTVA_ImperfectInfo(BTVA):
         best_strategy = max(strategies, key=strategies.get)
         best_improve = strategies[best_strategy]
 
-        if best_strategy == 'sincere' or best_improve <= 0:
-            print("\nNo strategic ballot improves average happiness. Staying sincere.\n")
+        if best_strategy == 'sincere' or best_improve <= GAIN_TOLERANCE:
+            tracer.info('best_strategy', "\nNo strategic ballot improves average happiness. Staying sincere.\n", strategy='sincere')
             used_strategy = False
 
             probability_of_regret = 0
             expected_regret = 0
 
         else:
-            print(f"\nBest strategy = {best_strategy.upper()}, improvement = {best_improve:.3f}\n")
+            tracer.info(
+                'best_strategy', "\nBest strategy = {strategy_upper}, improvement = {improvement:.3f}\n",
+                strategy=best_strategy, strategy_upper=best_strategy.upper(), improvement=best_improve
+            )
             used_strategy = True
             if best_strategy == 'bullet':
                 chosen_values = bullet_values
@@ -310,8 +365,10 @@ class BTVA_ImperfectInfo(BTVA):
                 
                 expected_regret = np.mean(np.abs(negative_improvements))
 
-        print(f"Probability of Regret: {probability_of_regret:.3f}")
-        print(f"Expected Regret:       {expected_regret:.3f}")
+        tracer.info(
+            'regret', "Probability of Regret: {probability:.3f}\nExpected Regret:       {expected:.3f}",
+            probability=probability_of_regret, expected=expected_regret
+        )
 
         self.avg_sincere_happiness = avg_sincere
         imperfect_incentives = np.zeros(self.num_voters)
@@ -324,54 +381,31 @@ class BTVA_ImperfectInfo(BTVA):
         return imperfect_incentives
 
 
-    def _fill_single_missing_candidates(self, matrix_with_nans):
+    def _fill_single_missing_candidates(self, partial_matrix):
         """
         For each column, if exactly one candidate is missing,
         we can directly place that missing candidate.
         """
-        matrix_copy = matrix_with_nans.copy()
+        matrix_copy = partial_matrix.copy()
         for voter in range(self.num_voters):
             col = matrix_copy[:, voter]
-            nan_positions = np.where(np.isnan(col))[0]
-            if len(nan_positions) == 1:
+            unknown_positions = np.flatnonzero(col == UNKNOWN)
+            if len(unknown_positions) == 1:
                 # Exactly one missing candidate
-                present = set(col[~np.isnan(col)].astype(int))
-                fullset = set(range(self.num_alternatives))
-                missing = list(fullset - present)
+                missing = missing_alternatives(col, self.num_alternatives)
                 if len(missing) == 1:
-                    matrix_copy[nan_positions[0], voter] = missing[0]
+                    matrix_copy[unknown_positions[0], voter] = missing[0]
         return matrix_copy
 
-   
+
+    @instrumented('all_completions')
     def _generate_all_completions(self, partial_matrix):
         """
-        Identify columns that have multiple NaNs and
+        Identify columns that have multiple unknown entries and
         try all permutations of the missing candidates.
         Return a list of fully-completed preference matrices.
         """
-        num_alts = self.num_alternatives
-        completions_per_col = []
-
-        for v in range(self.num_voters):
-            col = partial_matrix[:, v]
-            nan_positions = np.where(np.isnan(col))[0]
-            if len(nan_positions) == 0:
-                # Already fully known
-                completions_per_col.append([col])
-            else:
-                present = set(col[~np.isnan(col)].astype(int))
-                all_candidates = set(range(num_alts))
-                missing_candidates = list(all_candidates - present)
-
-                possible_columns = []
-                # Permute the missing candidates among the NaN slots
-                for perm in itertools.permutations(missing_candidates):
-                    candidate_col = col.copy()
-                    for idx, cand in zip(nan_positions, perm):
-                        candidate_col[idx] = cand
-                    possible_columns.append(candidate_col)
-
-                completions_per_col.append(possible_columns)
+        completions_per_col = [self._column_completions(partial_matrix[:, v]) for v in range(self.num_voters)]
 
         # cartesian product over all columns
         all_completions = []
@@ -380,157 +414,234 @@ class BTVA_ImperfectInfo(BTVA):
             all_completions.append(mat)
         return all_completions
 
-    
-    def _apply_bullet_voting_and_evaluate(self, completed_matrix, sincere_ballot):
+    def _column_completions(self, col):
+        """All ways to fill the unknown entries of a single column (a list with one element if fully known)."""
+        return self.column_cache.column_completions(col, self.num_alternatives)
+
+    @instrumented('completion')
+    def _scenario_scores(self, partial_matrix, exclude_voter):
         """
-        In Borda: bullet = put exactly one candidate at index 0, all others -1.
-        In Plurality: similarly put one candidate at top, rest -1 or unranked.
-        Returns the maximum happiness the strategic voter can achieve
-        by bullet voting on this scenario.
+        Score totals of every completion of partial_matrix without exclude_voter's column, one row per
+        completion in the order of _generate_all_completions. Built from the cached per-column
+        contributions instead of running an election per completion.
         """
-        best_h = -999999
-        num_alts = self.num_alternatives
-
-        for c in range(num_alts):
-            # Construct bullet ballot
-            if self.voting_scheme == 'borda':
-                bullet_pref = np.full_like(sincere_ballot, -1)
-                bullet_pref[0] = c
-            elif self.voting_scheme == 'plurality':
-                # For 'plurality', same idea
-                bullet_pref = np.full_like(sincere_ballot, -1)
-                bullet_pref[0] = c
-            elif self.voting_scheme == 'anti_plurality':
-                bullet_pref = np.full_like(sincere_ballot, -1)
-                bullet_pref[-1] = c
-            elif self.voting_scheme == 'voting_for_two':
-                bullet_pref = np.full_like(sincere_ballot, -1)
-                bullet_pref[0] = c  # only one top choice
-
-            test_matrix = completed_matrix.copy()
-            test_matrix[:, self.strategic_voter_idx] = bullet_pref
-
-            test_btva = BTVA(self.voting_scheme, test_matrix, self.original_full_matrix)
-            test_btva.run_non_strategic_election()
-            my_happiness = test_btva.happinesses[self.strategic_voter_idx]
-            if my_happiness > best_h:
-                best_h = my_happiness
-
-        return best_h
-
-    def _apply_compromise_voting_and_evaluate(self, completed_matrix, sincere_ballot):
+        totals = np.zeros((1, self.num_alternatives))
+        hits, misses = self.column_cache.hits, self.column_cache.misses
+        for voter in range(self.num_voters):
+            if voter == exclude_voter:
+                continue
+            contributions = self.column_cache.column_contributions(
+                partial_matrix[:, voter], self.voting_scheme, self.num_alternatives
+            )
+            # the last column varies fastest, like itertools.product
+            totals = (totals[:, np.newaxis, :] + contributions[np.newaxis, :, :]).reshape(-1, self.num_alternatives)
+        if self.stats is not None:
+            self.stats.count('cache_hits', self.column_cache.hits - hits)
+            self.stats.count('cache_misses', self.column_cache.misses - misses)
+        return totals
+
+    def _bullet_ballots(self, sincere_ballot):
         """
-        In Borda: artificially raise some candidate to the top.
-        In Plurality: simply place that 'compromise candidate' at index 0.
-        Returns max happiness found among all compromise moves.
+        In Borda: bullet = put exactly one candidate at index 0, all others UNRANKED.
+        In Plurality/Voting-for-two: similarly put one candidate at top, rest unranked.
+        In Anti-plurality: the single ranked candidate is the vetoed (last) one.
         """
-        best_h = -999999
+        ballots = []
+        for c in range(self.num_alternatives):
+            bullet_pref = np.full_like(sincere_ballot, UNRANKED)
+            if self.voting_scheme == 'anti_plurality':
+                bullet_pref[-1] = c
+            else:
+                bullet_pref[0] = c
+            ballots.append(bullet_pref)
+        if self.stats is not None:
+            self.stats.count('ballots_tried.bullet', len(ballots))
+        return ballots
+
+    def _compromise_ballots(self, sincere_ballot):
+        """Raise every candidate other than the sincere favourite to the top."""
+        ballots = []
         sincere_top = sincere_ballot[0]
-
-        all_candidates = set(range(self.num_alternatives)) - {sincere_top}
-        for c in all_candidates:
-            if self.voting_scheme == 'borda':
-                # find c's original index
-                loc = np.where(sincere_ballot == c)[0]
-                if len(loc) == 0:
-                    continue
-                loc = loc[0]
-                comp_pref = np.delete(sincere_ballot, loc)
-                comp_pref = np.insert(comp_pref, 0, c)
-            elif self.voting_scheme == 'plurality':
-                # For 'plurality', just put c at 0
-                comp_pref = sincere_ballot.copy()
-                comp_pref = comp_pref[comp_pref != c]
-                comp_pref = np.insert(comp_pref, 0, c)
-            elif self.voting_scheme == 'anti_plurality':
-                idx_c = np.where(sincere_ballot == c)[0]
-                if len(idx_c) == 0:
-                    continue
-                idx_c = idx_c[0]
-                comp_pref = np.delete(sincere_ballot, idx_c)
-                comp_pref = np.insert(comp_pref, 0, c)
-
-            elif self.voting_scheme == 'voting_for_two':
-                idx_c = np.where(sincere_ballot == c)[0]
-                if len(idx_c) == 0:
-                    continue
-                idx_c = idx_c[0]
-                comp_pref = np.delete(sincere_ballot, idx_c)
-                comp_pref = np.insert(comp_pref, 0, c)
-               
-
-            test_matrix = completed_matrix.copy()
-            test_matrix[:, self.strategic_voter_idx] = comp_pref
-            test_btva = BTVA(self.voting_scheme, test_matrix, self.original_full_matrix)
-            test_btva.run_non_strategic_election()
-            my_happiness = test_btva.happinesses[self.strategic_voter_idx]
-            if my_happiness > best_h:
-                best_h = my_happiness
-
-        return best_h
-
-    def _apply_bury_voting_and_evaluate(self, completed_matrix, sincere_ballot):
+        for c in sorted(set(range(self.num_alternatives)) - {sincere_top}):
+            loc = np.where(sincere_ballot == c)[0]
+            if len(loc) == 0:
+                continue
+            comp_pref = np.delete(sincere_ballot, loc[0])
+            ballots.append(np.insert(comp_pref, 0, c))
+        if self.stats is not None:
+            self.stats.count('ballots_tried.compromise', len(ballots))
+        return ballots
+
+    def _bury_ballots(self, sincere_ballot):
+        """Push every candidate other than the sincere last choice to the bottom."""
+        ballots = []
+        sincere_bottom = sincere_ballot[-1]
+        for c in sorted(set(range(self.num_alternatives)) - {sincere_bottom}):
+            loc = np.where(sincere_ballot == c)[0]
+            if len(loc) == 0:
+                continue
+            bury_pref = np.delete(sincere_ballot, loc[0])
+            ballots.append(np.append(bury_pref, c))
+        if self.stats is not None:
+            self.stats.count('ballots_tried.bury', len(ballots))
+        return ballots
+
+    ###############################
+    # All-voters analysis
+    ###############################
+    def run_all_voters_strategic_voting(self):
         """
-        In Borda: artificially push some rival candidate c to the bottom.
-        In Plurality: do a similar 'move c to last' approach.
-        Returns max happiness found.
+        Single-round strategic analysis for every voter at once.
+
+        Each voter sees the partial matrix with their own column revealed. Instead of
+        enumerating whole completed matrices per voter, every uncertain column is reduced to
+        the distribution of its score contributions, and the distributions of "all other
+        voters" are built from shared prefix/suffix combinations. The completions and base
+        scores are therefore computed once and reused by all voters.
+
+        Returns a dict of per-voter arrays:
+          'expected_gains'         -> (num_voters, 3) average improvement of bullet, compromise, bury over sincere
+          'probability_of_regret'  -> chance the best strategy does worse than sincere voting
+          'expected_regret'        -> average loss over the scenarios where it does
+          'best_strategy'          -> chosen strategy per voter ('sincere' if none improves)
+          'voter_strategic_gains'  -> relative gains (like BTVA.calc_strategic_gains), usable with risk.py
         """
-        best_h = -999999
-        sincere_bottom = sincere_ballot[-1]
+        strategies = ['bullet', 'compromise', 'bury']
+        partial = self._fill_single_missing_candidates(self.partial_preference_matrix)
 
-        all_candidates = set(range(self.num_alternatives)) - {sincere_bottom}
-        for c in all_candidates:
-            if self.voting_scheme == 'borda':
-                loc = np.where(sincere_ballot == c)[0]
-                if len(loc) == 0:
-                    continue
-                loc = loc[0]
-                bury_pref = np.delete(sincere_ballot, loc)
-                bury_pref = np.append(bury_pref, c)
-            elif self.voting_scheme == 'plurality':
-                bury_pref = sincere_ballot.copy()
-                bury_pref = np.delete(bury_pref, np.where(bury_pref == c))
-                bury_pref = np.append(bury_pref, c)
-
-            elif self.voting_scheme == 'anti_plurality':
-                idx_c = np.where(sincere_ballot == c)[0]
-                if len(idx_c) == 0:
-                    continue
-                idx_c = idx_c[0]
-                bury_pref = np.delete(sincere_ballot, idx_c)
-                bury_pref = np.append(bury_pref, c)
-            
-            elif self.voting_scheme == 'voting_for_two':
-                idx_c = np.where(sincere_ballot == c)[0]
-                if len(idx_c) == 0:
-                    continue
-                idx_c = idx_c[0]
-                bury_pref = np.delete(sincere_ballot, idx_c)
-                bury_pref = np.append(bury_pref, c)
-
-            test_matrix = completed_matrix.copy()
-            test_matrix[:, self.strategic_voter_idx] = bury_pref
-            test_btva = BTVA(self.voting_scheme, test_matrix, self.original_full_matrix)
-            test_btva.run_non_strategic_election()
-            my_happiness = test_btva.happinesses[self.strategic_voter_idx]
-            if my_happiness > best_h:
-                best_h = my_happiness
-
-        return best_h
-
-
-
-
-
-pref_matrix = generate_random_preferences_matrix(5,10)
-
-print("\n=== Imperfect Information Strategic Voting ===")
-btva_imperfect = BTVA_ImperfectInfo('borda', pref_matrix, noise_level=0.2)
-
-basic_result = btva_imperfect.run_non_strategic_election()
-print("Non-strategic election result:", basic_result)
-print("Voter happinesses (non-strategic):", btva_imperfect.happinesses)
-
-
-imperfect_incentives = btva_imperfect.run_strategic_voting(basic_result)
-print("Imperfect Information Incentives:", imperfect_incentives)
+        # per-column score distributions (shared by every voter)
+        uncertain_voters = []
+        column_distributions = []
+        known_contributions = np.zeros((self.num_voters, self.num_alternatives))
+        for voter in range(self.num_voters):
+            contributions = self.column_cache.column_contributions(partial[:, voter], self.voting_scheme, self.num_alternatives)
+            if len(contributions) == 1:
+                known_contributions[voter] = contributions[0]
+            else:
+                uncertain_voters.append(voter)
+                column_distributions.append(self._score_distribution(contributions))
+        known_total = known_contributions.sum(axis=0)
+
+        # prefix[i] combines columns [0, i), suffix[i] combines columns [i, k)
+        identity = (np.zeros((1, self.num_alternatives)), np.ones(1))
+        prefix = [identity]
+        for distribution in column_distributions:
+            prefix.append(self._combine_distributions(prefix[-1], distribution))
+        suffix = [identity]
+        for distribution in reversed(column_distributions):
+            suffix.append(self._combine_distributions(distribution, suffix[-1]))
+        suffix.reverse()
+
+        expected_gains = np.zeros((self.num_voters, len(strategies)))
+        probability_of_regret = np.zeros(self.num_voters)
+        expected_regret = np.zeros(self.num_voters)
+        voter_strategic_gains = np.zeros(self.num_voters)
+        best_strategies = ['sincere'] * self.num_voters
+
+        for voter in range(self.num_voters):
+            if voter in uncertain_voters:
+                i = uncertain_voters.index(voter)
+                others, weights = self._combine_distributions(prefix[i], suffix[i + 1])
+                base = others + known_total
+            else:
+                others, weights = prefix[-1]
+                base = others + (known_total - known_contributions[voter])
+
+            sincere_ballot = self.original_full_matrix[:, voter]
+            sincere_values = self._voter_happiness_over(voter, base, [sincere_ballot])
+            strategy_values = [
+                self._voter_happiness_over(voter, base, ballots)
+                for ballots in (self._bullet_ballots(sincere_ballot),
+                                self._compromise_ballots(sincere_ballot),
+                                self._bury_ballots(sincere_ballot))
+            ]
+
+            avg_sincere = np.dot(weights, sincere_values)
+            improvements = np.array([np.dot(weights, values) for values in strategy_values]) - avg_sincere
+            expected_gains[voter] = improvements
+
+            best = int(np.argmax(improvements))
+            if improvements[best] > GAIN_TOLERANCE:
+                best_strategies[voter] = strategies[best]
+                chosen_values = strategy_values[best]
+                differences = chosen_values - sincere_values
+                regrets = differences < 0
+                probability_of_regret[voter] = np.dot(weights, regrets)
+                if probability_of_regret[voter] > 0:
+                    expected_regret[voter] = np.dot(weights[regrets], np.abs(differences[regrets])) / np.sum(weights[regrets])
+                avg_chosen = avg_sincere + improvements[best]
+                voter_strategic_gains[voter] = improvements[best] / avg_chosen
+
+        self.all_voters_results = {
+            'expected_gains': expected_gains,
+            'probability_of_regret': probability_of_regret,
+            'expected_regret': expected_regret,
+            'best_strategy': best_strategies,
+            'voter_strategic_gains': voter_strategic_gains
+        }
+        return self.all_voters_results
+
+    @staticmethod
+    def _score_distribution(contributions):
+        """Distinct score vectors of one column with their probability (all completions equally likely)."""
+        rows, inverse = np.unique(contributions, axis=0, return_inverse=True)
+        weights = np.bincount(inverse.ravel(), minlength=len(rows)) / len(contributions)
+        return rows, weights
+
+    @staticmethod
+    def _combine_distributions(first, second):
+        """Distribution of the sum of two independent score distributions, merged on identical sums."""
+        rows_a, weights_a = first
+        rows_b, weights_b = second
+        sums = (rows_a[:, np.newaxis, :] + rows_b[np.newaxis, :, :]).reshape(-1, rows_a.shape[1])
+        products = np.outer(weights_a, weights_b).ravel()
+        rows, inverse = np.unique(sums, axis=0, return_inverse=True)
+        weights = np.bincount(inverse.ravel(), weights=products, minlength=len(rows))
+        return rows, weights
+
+    @instrumented('happiness')
+    def _voter_happiness_over(self, voter, base, ballots):
+        """
+        Best happiness of `voter` over `ballots` for every row of `base` (other voters' score totals).
+        Rankings that repeat across rows or ballots are evaluated only once.
+        """
+        true_preference = self.original_full_matrix[:, voter]
+        contributions = column_scores(np.column_stack(ballots), self.voting_scheme, self.num_alternatives)
+        best = np.full(len(base), -np.inf)
+        happiness_cache = {}
+        for contribution in contributions:
+            rankings = np.argsort(-(base + contribution), axis=1, kind='stable')
+            unique_rankings, inverse = np.unique(rankings, axis=0, return_inverse=True)
+            values = np.empty(len(unique_rankings))
+            for r, ranking in enumerate(unique_rankings):
+                key = ranking.tobytes()
+                if key not in happiness_cache:
+                    happiness_cache[key] = self._happiness(true_preference, ranking)
+                values[r] = happiness_cache[key]
+            best = np.maximum(best, values[inverse.ravel()])
+        if self.stats is not None:
+            # every (scenario, ballot) pair is one election outcome; distinct rankings need a happiness call
+            self.stats.count('elections', len(base) * len(contributions))
+            self.stats.count('happiness_calls', len(happiness_cache))
+        return best
+
+
+if __name__ == "__main__":
+    pref_matrix = generate_random_preferences_matrix(5,10)
+
+    print("\n=== Imperfect Information Strategic Voting ===")
+    btva_imperfect = BTVA_ImperfectInfo('borda', pref_matrix, noise_level=0.2)
+
+    basic_result = btva_imperfect.run_non_strategic_election()
+    print("Non-strategic election result:", basic_result)
+    print("Voter happinesses (non-strategic):", btva_imperfect.happinesses)
+
+
+    imperfect_incentives = btva_imperfect.run_strategic_voting(basic_result)
+    print("Imperfect Information Incentives:", imperfect_incentives)
+
+    print("\n=== All-Voters Imperfect Information Analysis ===")
+    all_voters = btva_imperfect.run_all_voters_strategic_voting()
+    print("Best strategy per voter:", all_voters['best_strategy'])
+    print("Voter strategic gains:", np.around(all_voters['voter_strategic_gains'], 3))
+    print(f"Average gain risk: {svr.average_gain_risk(all_voters['voter_strategic_gains']):.3f}")
@@ -1,15 +1,25 @@
 import numpy as np
 import matplotlib.pyplot as plt
+import tracing
 
-from atva_imperfect_knowledge import BTVA_ImperfectInfo
-from b_main import generate_random_preferences_matrix
+from atva_imperfect_knowledge import BTVA_ImperfectInfo, ColumnCache, hiding_order
+from helper_functions import generate_random_preferences_matrix
+from results_sink import ResultsSink
+from sweeps import grid, run_sweep, average_by, paired_differences
+
+# measured values of one trial as written to a results_sink.ResultsSink (the run metadata columns come first)
+RESULT_COLUMNS = {
+    'noise_level': 'float', 'strategic_voter_idx': 'int', 'trial': 'int',
+    'risk': 'float', 'sincere_happiness': 'float', 'final_happiness': 'float',
+}
 
 def run_single_ik_trial(
     voting_scheme, 
     num_alternatives, 
     num_voters, 
     noise_level=0.2, 
-    strategic_voter_idx=0
+    strategic_voter_idx=0,
+    rng=None
 ):
     """
     - Generates a random full preference matrix using generate_random_preferences_matrix.
@@ -17,23 +27,150 @@ def run_single_ik_trial(
     - Runs non-strategic election (optional) and then run_strategic_voting.
     - Returns a dict with final risk, the strategic voter's final happiness, 
       and possibly other measures (prob_of_regret, expected_regret).
+    rng (a np.random.Generator or seed) drives both the profile and the hidden entries;
+    the global np.random state is used if it is None.
     """
+    if rng is not None:
+        rng = np.random.default_rng(rng)
 
     full_matrix = generate_random_preferences_matrix(
         num_alternatives, 
-        num_voters
+        num_voters,
+        rng=rng
     )
 
     btva_imperfect = BTVA_ImperfectInfo(
         voting_scheme=voting_scheme,
         original_pref_matrix=full_matrix,
         noise_level=noise_level,
-        strategic_voter_idx=strategic_voter_idx
+        strategic_voter_idx=strategic_voter_idx,
+        rng=rng
     )
 
+    return _ik_outcome(btva_imperfect)
+
+def run_paired_ik_trial(
+    voting_schemes,
+    num_alternatives,
+    num_voters,
+    noise_level=0.2,
+    strategic_voter_idx=0,
+    rng=None
+):
+    """
+    Common-random-numbers version of run_single_ik_trial: the profile and the hidden entries are
+    drawn once and every scheme in voting_schemes is evaluated on them.
+    Returns {voting_scheme: outcome dict}.
+    """
+    if rng is not None:
+        rng = np.random.default_rng(rng)
+
+    full_matrix = generate_random_preferences_matrix(
+        num_alternatives,
+        num_voters,
+        rng=rng
+    )
+
+    outcomes = {}
+    partial_matrix = None
+    for scheme in voting_schemes:
+        btva_imperfect = BTVA_ImperfectInfo(
+            voting_scheme=scheme,
+            original_pref_matrix=full_matrix,
+            noise_level=noise_level,
+            strategic_voter_idx=strategic_voter_idx,
+            rng=rng,
+            partial_pref_matrix=partial_matrix
+        )
+        partial_matrix = btva_imperfect.partial_preference_matrix
+        outcomes[scheme] = _ik_outcome(btva_imperfect)
+    return outcomes
+
+def run_nested_noise_trial(
+    voting_schemes,
+    num_alternatives,
+    num_voters,
+    noise_level=(0.1, 0.2, 0.3),
+    strategic_voter_idx=0,
+    rng=None
+):
+    """
+    One profile evaluated at every noise level in `noise_level` (a sequence here) with nested masks:
+    the entries are hidden in one random order, so each higher noise level hides a superset of the
+    entries of a lower one. All levels and schemes share a ColumnCache, so a column hidden the same
+    way at several levels is completed and scored once, and the noise curve of a trial is smooth.
+    Returns {voting_scheme: [outcome dict with its 'noise_level', one per level]}.
+    """
+    rng = np.random if rng is None else np.random.default_rng(rng)
+
+    full_matrix = generate_random_preferences_matrix(
+        num_alternatives,
+        num_voters,
+        rng=rng
+    )
+    order = hiding_order(num_alternatives, num_voters, strategic_voter_idx, rng)
+    column_cache = ColumnCache()
+
+    outcomes = {scheme: [] for scheme in voting_schemes}
+    for level in noise_level:
+        for scheme in voting_schemes:
+            btva_imperfect = BTVA_ImperfectInfo(
+                voting_scheme=scheme,
+                original_pref_matrix=full_matrix,
+                noise_level=level,
+                strategic_voter_idx=strategic_voter_idx,
+                hiding_order=order,
+                column_cache=column_cache
+            )
+            outcomes[scheme].append({'noise_level': level, **_ik_outcome(btva_imperfect)})
+    return outcomes
+
+def run_growing_ik_trial(
+    voting_schemes,
+    num_alternatives,
+    num_voters=(5, 10, 20),
+    noise_level=0.2,
+    strategic_voter_idx=0,
+    rng=None
+):
+    """
+    One profile evaluated at every electorate size in `num_voters` (a sequence here): each size
+    uses the first columns of the largest profile, like electorate_growth.GrowingElectorate, and
+    hides entries in one random order restricted to those columns. Columns hidden the same way at
+    several sizes are completed and scored once (shared ColumnCache), and the curve over the sizes
+    of one trial is not blurred by drawing unrelated profiles.
+    Returns {voting_scheme: [outcome dict with its 'num_voters', one per size]}.
+    """
+    rng = np.random if rng is None else np.random.default_rng(rng)
+
+    full_matrix = generate_random_preferences_matrix(
+        num_alternatives,
+        max(num_voters),
+        rng=rng
+    )
+    order = hiding_order(num_alternatives, max(num_voters), strategic_voter_idx, rng)
+    column_cache = ColumnCache()
+
+    outcomes = {scheme: [] for scheme in voting_schemes}
+    for size in num_voters:
+        for scheme in voting_schemes:
+            btva_imperfect = BTVA_ImperfectInfo(
+                voting_scheme=scheme,
+                original_pref_matrix=full_matrix[:, :size],
+                noise_level=noise_level,
+                strategic_voter_idx=strategic_voter_idx,
+                hiding_order=order[order[:, 1] < size],
+                column_cache=column_cache
+            )
+            outcomes[scheme].append({'num_voters': size, **_ik_outcome(btva_imperfect)})
+    return outcomes
+
+def _ik_outcome(btva_imperfect):
     btva_imperfect.run_non_strategic_election()
 
-    _ = btva_imperfect.run_strategic_voting(None)
+    # batch mode: the per-completion trace events are never formatted
+    with tracing.quiet():
+        _ = btva_imperfect.run_strategic_voting(None)
 
     final_risk = btva_imperfect.risk_of_strategic_voting
 
@@ -46,74 +183,96 @@ def run_single_ik_trial(
         'final_happiness': final_chosen_hap
     }
 
-def experiment_vary_num_voters(
-    voting_schemes, 
-    voter_counts, 
-    num_alternatives=5,
-    noise_level=0.2,
+def run_ik_experiment(
+    voting_schemes,
+    param_grid,
     trials_per_setting=10,
-    strategic_voter_idx=0
+    seed=0,
+    cache_dir='.sweep_cache',
+    processes=None,
+    results_sink=None,
+    paired=False
 ):
     """
-    For each voting scheme in 'voting_schemes' and each number of voters in 'voter_counts',
-    run 'trials_per_setting' independent random trials, then average the results.
-    
-    Plots the average risk and average happiness in one figure, 
-    showing a separate line for each voting scheme.
+    Runs run_single_ik_trial for every scheme, parameter dict of param_grid and trial through
+    sweeps.run_sweep (trials are cached in cache_dir and run in parallel) and returns the
+    per-trial rows. With paired=True all schemes share each trial's profile and hidden entries
+    (run_paired_ik_trial), so they can be compared with sweeps.paired_differences.
     """
+    return run_sweep(
+        run_paired_ik_trial if paired else run_single_ik_trial,
+        voting_schemes,
+        param_grid,
+        trials=trials_per_setting,
+        seed=seed,
+        cache_dir=cache_dir,
+        processes=processes,
+        results_sink=results_sink,
+        paired=paired
+    )
+
+def _vary_one(voting_schemes, axis, values, fixed, result_key, title, xlabel, trials_per_setting, seed,
+              cache_dir, processes, results_sink, paired, nested=False):
+    # shared body of the experiment_vary_* functions: sweep one parameter, average, plot
+    print(f"\n=== Experiment: {', '.join(voting_schemes)} while varying {title} ===")
+    if nested:
+        # one cell per trial covering every value of the axis (and scheme) on that trial's profile
+        paired = True
+        rows = run_sweep(
+            {'noise_level': run_nested_noise_trial, 'num_voters': run_growing_ik_trial}[axis],
+            voting_schemes,
+            grid(**{axis: [list(values)]}, **{name: [value] for name, value in fixed.items()}),
+            trials=trials_per_setting,
+            seed=seed,
+            cache_dir=cache_dir,
+            processes=processes,
+            results_sink=results_sink,
+            paired=True
+        )
+    else:
+        rows = run_ik_experiment(
+            voting_schemes,
+            grid(**{axis: values}, **{name: [value] for name, value in fixed.items()}),
+            trials_per_setting=trials_per_setting,
+            seed=seed,
+            cache_dir=cache_dir,
+            processes=processes,
+            results_sink=results_sink,
+            paired=paired
+        )
+    averages = average_by(rows, ['voting_scheme', axis], ['risk', 'sincere_happiness', 'final_happiness'])
+
     results = {}
     for scheme in voting_schemes:
+        selected = [row for row in averages if row['voting_scheme'] == scheme]
         results[scheme] = {
-            'voters': [],
-            'avg_risk': [],
-            'avg_sincere_happiness': [],
-            'avg_final_hap' : []
+            result_key: [row[axis] for row in selected],
+            'avg_risk': [row['risk'] for row in selected],
+            'avg_sincere_happiness': [row['sincere_happiness'] for row in selected],
+            'avg_final_hap' : [row['final_happiness'] for row in selected]
         }
 
-
-    for scheme in voting_schemes:
-        print(f"\n=== Experiment: {scheme} while varying #Voters ===")
-        for N in voter_counts:
-            all_risks = []
-            all_happiness = []
-            sincere_happs = []
-
-            for _ in range(trials_per_setting):
-                outcome = run_single_ik_trial(
-                    voting_scheme=scheme,
-                    num_alternatives=num_alternatives,
-                    num_voters=N,
-                    noise_level=noise_level,
-                    strategic_voter_idx=strategic_voter_idx
-                )
-                all_risks.append(outcome['risk'])
-                sincere_happs.append(outcome['sincere_happiness'])
-                all_happiness.append(outcome['final_happiness'])
-
-            avg_risk = np.mean(all_risks)
-            avg_sincere = np.mean(sincere_happs)
-            avg_hap  = np.mean(all_happiness)
-
-            results[scheme]['voters'].append(N)
-            results[scheme]['avg_risk'].append(avg_risk)
-            results[scheme]['avg_final_hap'].append(avg_hap)
-            results[scheme]['avg_sincere_happiness'].append(avg_sincere)
-
+    if paired:
+        # differences to the first scheme, trial by trial on the same profiles
+        baseline = voting_schemes[0]
+        for value, result_name in (('risk', 'paired_risk_difference'), ('final_happiness', 'paired_final_hap_difference')):
+            for summary in paired_differences(rows, [axis], value, baseline):
+                results[summary['voting_scheme']].setdefault(result_name, []).append(summary['mean'])
+                results[summary['voting_scheme']].setdefault(result_name + '_ci', []).append(
+                    (summary['ci_low'], summary['ci_high']))
+                print(f"{summary['voting_scheme']} - {baseline} {value} at {axis}={summary[axis]}: "
+                      f"{summary['mean']:.4f} [{summary['ci_low']:.4f}, {summary['ci_high']:.4f}]")
 
     plt.figure(figsize=(8,6))
     for scheme in voting_schemes:
-        x_vals = results[scheme]['voters']
-        y_risk = results[scheme]['avg_risk']
-        y_sincere = results[scheme]['avg_sincere_happiness']
-        y_hap  = results[scheme]['avg_final_hap']
-
-        plt.plot(x_vals, y_risk, marker='o', label=f'{scheme} Risk')
-
-        plt.plot(x_vals, y_sincere, marker='x', label=f'{scheme} Sincere Happiness')
-        plt.plot(x_vals, y_hap, marker='x', label=f'{scheme} Final Happiness')
-
-    plt.title(f"Varying Number of Voters (alts={num_alternatives}, noise={noise_level})")
-    plt.xlabel("Number of Voters")
+        x_vals = results[scheme][result_key]
+        plt.plot(x_vals, results[scheme]['avg_risk'], marker='o', label=f'{scheme} Risk')
+        plt.plot(x_vals, results[scheme]['avg_sincere_happiness'], marker='x', label=f'{scheme} Sincere Happiness')
+        plt.plot(x_vals, results[scheme]['avg_final_hap'], marker='x', label=f'{scheme} Final Happiness')
+
+    fixed_text = ', '.join(f"{name}={value}" for name, value in fixed.items() if name != 'strategic_voter_idx')
+    plt.title(f"Varying {title} ({fixed_text})")
+    plt.xlabel(xlabel)
     plt.ylabel("Value")
     plt.grid(True)
     plt.legend()
@@ -121,6 +280,38 @@ def experiment_vary_num_voters(
 
     return results
 
+def experiment_vary_num_voters(
+    voting_schemes, 
+    voter_counts, 
+    num_alternatives=5,
+    noise_level=0.2,
+    trials_per_setting=10,
+    strategic_voter_idx=0,
+    results_sink=None,
+    seed=0,
+    cache_dir='.sweep_cache',
+    processes=None,
+    paired=False,
+    grow=False
+):
+    """
+    For each voting scheme in 'voting_schemes' and each number of voters in 'voter_counts',
+    run 'trials_per_setting' independent random trials, then average the results.
+    With paired=True every scheme is evaluated on the same random trials (common random numbers)
+    and the paired differences to the first scheme are added to the results.
+    With grow=True each trial grows one profile over all voter counts (run_growing_ik_trial)
+    instead of drawing a new one per count; schemes are then paired as well.
+    
+    Plots the average risk and average happiness in one figure, 
+    showing a separate line for each voting scheme.
+    """
+    return _vary_one(
+        voting_schemes, 'num_voters', voter_counts,
+        {'num_alternatives': num_alternatives, 'noise_level': noise_level, 'strategic_voter_idx': strategic_voter_idx},
+        'voters', 'Number of Voters', "Number of Voters",
+        trials_per_setting, seed, cache_dir, processes, results_sink, paired, grow
+    )
+
 
 def experiment_vary_num_alternatives(
     voting_schemes,
@@ -128,64 +319,19 @@ def experiment_vary_num_alternatives(
     num_voters=20,
     noise_level=0.2,
     trials_per_setting=10,
-    strategic_voter_idx=0
+    strategic_voter_idx=0,
+    results_sink=None,
+    seed=0,
+    cache_dir='.sweep_cache',
+    processes=None,
+    paired=False
 ):
-    results = {}
-    for scheme in voting_schemes:
-        results[scheme] = {
-            'alts': [],
-            'avg_risk': [],
-            'avg_sincere_happiness': [],
-            'avg_final_hap' : []
-        }
-
-    for scheme in voting_schemes:
-        print(f"\n=== Experiment: {scheme} while varying #Alternatives ===")
-        for M in alternatives_list:
-            all_risks = []
-            all_happiness = []
-            sincere_happs = []
-
-            for _ in range(trials_per_setting):
-                outcome = run_single_ik_trial(
-                    voting_scheme=scheme,
-                    num_alternatives=M,
-                    num_voters=num_voters,
-                    noise_level=noise_level,
-                    strategic_voter_idx=strategic_voter_idx
-                )
-                all_risks.append(outcome['risk'])
-                sincere_happs.append(outcome['sincere_happiness'])
-                all_happiness.append(outcome['final_happiness'])
-
-            avg_risk = np.mean(all_risks)
-            avg_sincere = np.mean(sincere_happs)
-            avg_hap  = np.mean(all_happiness)
-
-            results[scheme]['alts'].append(M)
-            results[scheme]['avg_risk'].append(avg_risk)
-            results[scheme]['avg_final_hap'].append(avg_hap)
-            results[scheme]['avg_sincere_happiness'].append(avg_sincere)
-
-    plt.figure(figsize=(8,6))
-    for scheme in voting_schemes:
-        x_vals = results[scheme]['alts']
-        y_risk = results[scheme]['avg_risk']
-        y_hap  = results[scheme]['avg_final_hap']
-        y_sincere = results[scheme]['avg_sincere_happiness']
-
-        plt.plot(x_vals, y_risk, marker='o', label=f'{scheme} Risk')
-        plt.plot(x_vals, y_hap, marker='x', label=f'{scheme} Final Happiness')
-        plt.plot(x_vals, y_sincere, marker='x', label=f'{scheme} Sincere Happiness')
-
-    plt.title(f"Varying Number of Alternatives (voters={num_voters}, noise={noise_level})")
-    plt.xlabel("Number of Alternatives")
-    plt.ylabel("Value")
-    plt.grid(True)
-    plt.legend()
-    plt.show()
-
-    return results
+    return _vary_one(
+        voting_schemes, 'num_alternatives', alternatives_list,
+        {'num_voters': num_voters, 'noise_level': noise_level, 'strategic_voter_idx': strategic_voter_idx},
+        'alts', 'Number of Alternatives', "Number of Alternatives",
+        trials_per_setting, seed, cache_dir, processes, results_sink, paired
+    )
 
 
 def experiment_vary_noise_level(
@@ -194,71 +340,33 @@ def experiment_vary_noise_level(
     num_voters=20,
     num_alternatives=5,
     trials_per_setting=10,
-    strategic_voter_idx=0
+    strategic_voter_idx=0,
+    results_sink=None,
+    seed=0,
+    cache_dir='.sweep_cache',
+    processes=None,
+    paired=False,
+    nested=False
 ):
-    results = {}
-    for scheme in voting_schemes:
-        results[scheme] = {
-            'noise': [],
-            'avg_risk': [],
-            'avg_sincere_happiness': [],
-            'avg_final_hap' : []
-        }
-
-    for scheme in voting_schemes:
-        print(f"\n=== Experiment: {scheme} while varying noise level ===")
-        for nl in noise_levels:
-            all_risks = []
-            all_happiness = []
-            sincere_happs = []
-
-            for _ in range(trials_per_setting):
-                outcome = run_single_ik_trial(
-                    voting_scheme=scheme,
-                    num_alternatives=num_alternatives,
-                    num_voters=num_voters,
-                    noise_level=nl,
-                    strategic_voter_idx=strategic_voter_idx
-                )
-                all_risks.append(outcome['risk'])
-                sincere_happs.append(outcome['sincere_happiness'])
-                all_happiness.append(outcome['final_happiness'])
-
-
-            avg_risk = np.mean(all_risks)
-            avg_sincere = np.mean(sincere_happs)
-            avg_hap  = np.mean(all_happiness)
-
-            results[scheme]['noise'].append(nl)
-            results[scheme]['avg_risk'].append(avg_risk)
-            results[scheme]['avg_final_hap'].append(avg_hap)
-            results[scheme]['avg_sincere_happiness'].append(avg_sincere)
-
-    plt.figure(figsize=(8,6))
-    for scheme in voting_schemes:
-        x_vals = results[scheme]['noise']
-        y_risk = results[scheme]['avg_risk']
-        y_hap  = results[scheme]['avg_final_hap']
-        y_sincere = results[scheme]['avg_sincere_happiness']
-
-        
-        plt.plot(x_vals, y_risk, marker='o', label=f'{scheme} Risk')
-        plt.plot(x_vals, y_hap, marker='x', label=f'{scheme} Final Happiness')
-        plt.plot(x_vals, y_sincere, marker='x', label=f'{scheme} Sincere Happiness')
-
-    plt.title(f"Varying Noise Level (voters={num_voters}, alts={num_alternatives})")
-    plt.xlabel("Noise Level")
-    plt.ylabel("Value")
-    plt.grid(True)
-    plt.legend()
-    plt.show()
-
-    return results
+    """
+    Like experiment_vary_num_voters, over noise levels. With nested=True every trial keeps its
+    profile across the noise levels and hides a growing superset of entries (run_nested_noise_trial),
+    which reuses column completions between levels and gives smoother curves; schemes are then
+    compared on the same trials as with paired=True.
+    """
+    return _vary_one(
+        voting_schemes, 'noise_level', noise_levels,
+        {'num_voters': num_voters, 'num_alternatives': num_alternatives, 'strategic_voter_idx': strategic_voter_idx},
+        'noise', 'Noise Level', "Noise Level",
+        trials_per_setting, seed, cache_dir, processes, results_sink, paired, nested
+    )
 
 
 
 if __name__ == "__main__":
     voting_schemes = ['borda', 'plurality']
+    # every trial of the three experiments, for later analysis with results_sink.load_results
+    sink = ResultsSink("ik_results.csv", RESULT_COLUMNS)
     
     # A) Vary number of voters
     voter_range = [5, 10, 15, 20, 30]
@@ -268,7 +376,8 @@ if __name__ == "__main__":
         num_alternatives=5,
         noise_level=0.2,
         trials_per_setting=5,
-        strategic_voter_idx=0
+        strategic_voter_idx=0,
+        results_sink=sink
     )
     
     # B) Vary number of alternatives
@@ -279,7 +388,8 @@ if __name__ == "__main__":
         num_voters=15,
         noise_level=0.2,
         trials_per_setting=5,
-        strategic_voter_idx=0
+        strategic_voter_idx=0,
+        results_sink=sink
     ) 
     
     # C) Vary noise level
@@ -290,5 +400,7 @@ if __name__ == "__main__":
         num_voters=10,
         num_alternatives=5,
         trials_per_setting=5,
-        strategic_voter_idx=0
+        strategic_voter_idx=0,
+        results_sink=sink
     )
+    sink.close()
@@ -2,7 +2,8 @@ import numpy as np
 import itertools
 from happiness import *
 from btva import BTVA
-import matplotlib.pyplot as plt
+from ballots import election_result
+from profiles import impartial_culture
 
 ###############################################################################
 # 1. Advanced Voting System: Addressing Voter Collusion (Multiple-Voter Manipulations)
@@ -11,6 +12,13 @@ import matplotlib.pyplot as plt
 # make it work for diff group sizes and maybe dont do it in case the voter is already satisfied.
 # it currently uses only compromising/burying
 class BTVA_Collusion(BTVA):
+    def __init__(self, voting_scheme, preference_matrix, happiness_function=exponential_decay_happiness, stats=None):
+        super().__init__(preference_matrix, happiness_function, stats=stats)
+        self.voting_scheme = voting_scheme
+
+    def run_non_strategic_election(self):
+        return election_result(self.tally(self.voting_scheme))
+
     def run_collusive_strategic_voting(self, group_size):  
         """
         Check if groups of voters (of size group_size) can coordinate
@@ -57,7 +65,7 @@ class BTVA_Collusion(BTVA):
                 new_pref_matrix[:, voter] = new_ballot
             
             # Create a new election instance with the modified ballots
-            collusive_btva = BTVA(self.voting_scheme, new_pref_matrix)
+            collusive_btva = BTVA_Collusion(self.voting_scheme, new_pref_matrix, self.happiness_function, stats=self.stats)
             # Run the election with the collusive ballots
             new_result = collusive_btva.run_non_strategic_election()
             # Identify the new winner after the collusive move
@@ -84,10 +92,7 @@ pref_matrix = np.array([
 ])
 
 def generate_random_preference_matrix(num_voters, num_candidates):
-    preference_matrix = np.zeros((num_candidates, num_voters), dtype=int)
-    for voter in range(num_voters):
-        preference_matrix[:, voter] = np.random.permutation(num_candidates)
-    return preference_matrix
+    return impartial_culture(num_candidates, num_voters, rng=np.random)
 
 def run_experiments(voting_scheme, num_voters, num_candidates, group_size, num_trials):
     collusion_success_count = 0
@@ -106,7 +111,7 @@ def run_experiments(voting_scheme, num_voters, num_candidates, group_size, num_t
         # Calculate happiness after collusion
         election_result = btva_collusion.run_non_strategic_election()
         election_ranking, _ = election_result
-        happinesses = btva_collusion.calc_happinesses(preference_matrix, election_ranking, exponential_decay_happiness)
+        happinesses = btva_collusion.calc_happinesses(election_ranking)
         
         total_collusion_incentives += collusion_incentives
         total_happinesses += happinesses
@@ -118,31 +123,34 @@ def run_experiments(voting_scheme, num_voters, num_candidates, group_size, num_t
     
     return collusion_success_rate, average_collusion_incentives, average_happinesses, happiness_changes
 
-voting_schemes = ['plurality', 'borda']
-number_of_voters = 5
-number_of_candidates = 4
-group_sizes = [2,3,5]
-num_trials = 2
-
-# Run experiments
-for voting_scheme in voting_schemes:
-    for group_size in group_sizes:
-        success_rate, avg_incentives, avg_happinesses, happiness_changes = run_experiments(voting_scheme, number_of_voters, number_of_candidates, group_size, num_trials)
-        print(f"Voting Scheme: {voting_scheme}, Group Size: {group_size}")
-        print(f"Collusion Success Rate: {success_rate:.2f}")
-        print(f"Average Collusion Incentives: {avg_incentives}")
-        print(f"Average Happinesses: {avg_happinesses}")
-        print("")
-
-         # Plot happiness changes
-        plt.figure(figsize=(10, 6))
-        for trial in range(num_trials):
-            plt.plot(happiness_changes[trial], label=f'Trial {trial+1}')
-        plt.xlabel('Voter Index')
-        plt.ylabel('Happiness Level')
-        plt.title(f'Happiness Level Changes - Voting Scheme: {voting_scheme}, Group Size: {group_size}')
-        plt.legend()
-        plt.show()
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    voting_schemes = ['plurality', 'borda']
+    number_of_voters = 5
+    number_of_candidates = 4
+    group_sizes = [2,3,5]
+    num_trials = 2
+
+    # Run experiments
+    for voting_scheme in voting_schemes:
+        for group_size in group_sizes:
+            success_rate, avg_incentives, avg_happinesses, happiness_changes = run_experiments(voting_scheme, number_of_voters, number_of_candidates, group_size, num_trials)
+            print(f"Voting Scheme: {voting_scheme}, Group Size: {group_size}")
+            print(f"Collusion Success Rate: {success_rate:.2f}")
+            print(f"Average Collusion Incentives: {avg_incentives}")
+            print(f"Average Happinesses: {avg_happinesses}")
+            print("")
+
+             # Plot happiness changes
+            plt.figure(figsize=(10, 6))
+            for trial in range(num_trials):
+                plt.plot(happiness_changes[trial], label=f'Trial {trial+1}')
+            plt.xlabel('Voter Index')
+            plt.ylabel('Happiness Level')
+            plt.title(f'Happiness Level Changes - Voting Scheme: {voting_scheme}, Group Size: {group_size}')
+            plt.legend()
+            plt.show()
 
 
 # print("=== Collusive Strategic Voting ===")
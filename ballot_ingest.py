@@ -0,0 +1,192 @@
+import csv
+import itertools
+import os
+
+import numpy as np
+
+from ballots import UNRANKED, VOTING_SCHEMES, compact_dtype, column_scores, election_result
+from anonymous_profile import AnonymousProfile, can_encode, encode, decode
+
+# Reading real ballots from files in one streaming pass.
+# A file is read chunk_size lines at a time; every chunk of ballots (with their multiplicities) is
+# added to running score totals for all voting schemes and to a ballot-type histogram, then dropped.
+# Memory is bounded by the chunk size plus the number of distinct ballots, never by the electorate.
+# Supported formats:
+#   .csv      one ballot per row, 0-based alternative ids best first; empty cells (or short rows)
+#             are unranked slots of a truncated ballot
+#   .soc/.soi PrefLib strict complete / incomplete orders, current format ('# NUMBER ALTERNATIVES: m'
+#             metadata, 'count: a,b,c' lines) or the legacy one (header counts, 'count,a,b,c' lines);
+#             PrefLib's 1-based alternatives become 0-based ids
+# Truncated ballots are padded with UNRANKED (-1), like bullet ballots elsewhere in the repo.
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+class BallotHistogram:
+    """Running count of every distinct ballot (int64 codes when they fit, raw bytes otherwise)."""
+
+    def __init__(self, num_alternatives):
+        self.num_alternatives = num_alternatives
+        self.counts = {}
+
+    def add(self, ballots, counts):
+        if can_encode(self.num_alternatives):
+            keys, inverse = np.unique(encode(ballots, self.num_alternatives), return_inverse=True)
+            totals = np.bincount(inverse.ravel(), weights=counts, minlength=len(keys)).astype(np.int64)
+            keys = keys.tolist()
+        else:
+            keys = [ballot.tobytes() for ballot in ballots]
+            totals = counts
+        for key, total in zip(keys, totals.tolist()):
+            self.counts[key] = self.counts.get(key, 0) + total
+
+    def to_profile(self):
+        m = self.num_alternatives
+        counts = np.array(list(self.counts.values()), dtype=np.int64)
+        if can_encode(m):
+            ballots = decode(np.array(list(self.counts), dtype=np.int64), m)
+        else:
+            ballots = np.array([np.frombuffer(key, dtype=compact_dtype(m)) for key in self.counts]).reshape(-1, m)
+        return AnonymousProfile(ballots, counts, m)
+
+
+class BallotSummary:
+    """
+    Everything one pass over a ballot file produces:
+    scores[voting_scheme] : total scores, as the BTVA classes' run_non_strategic_election tallies them
+    profile               : AnonymousProfile with the distinct ballots and their counts
+    alternative_names     : {alternative id: name} when the file has them
+    """
+
+    def __init__(self, num_alternatives, voting_schemes=VOTING_SCHEMES):
+        self.num_alternatives = num_alternatives
+        self.num_voters = 0
+        self.scores = {voting_scheme: np.zeros(num_alternatives) for voting_scheme in voting_schemes}
+        self.histogram = BallotHistogram(num_alternatives)
+        self.alternative_names = {}
+
+    def add(self, ballots, counts):
+        """Add a chunk: ballots (k, num_alternatives), counts (k,) voters casting each."""
+        counts = np.asarray(counts, dtype=np.int64)
+        for voting_scheme in self.scores:
+            self.scores[voting_scheme] += counts @ column_scores(ballots.T, voting_scheme, self.num_alternatives)
+        self.histogram.add(ballots, counts)
+        self.num_voters += int(counts.sum())
+
+    @property
+    def profile(self):
+        return self.histogram.to_profile()
+
+    def election_result(self, voting_scheme):
+        return election_result(self.scores[voting_scheme])
+
+    def to_matrix(self):
+        """(num_alternatives, num_voters) matrix for the BTVA classes (voters grouped by ballot)."""
+        return self.profile.to_matrix()
+
+
+def _ballot_array(rows, num_alternatives):
+    # rows: lists of alternative ids (best first), possibly shorter than num_alternatives
+    ballots = np.full((len(rows), num_alternatives), UNRANKED, dtype=compact_dtype(num_alternatives))
+    for i, row in enumerate(rows):
+        if len(row) > num_alternatives:
+            raise ValueError(f"ballot {row} ranks more than {num_alternatives} alternatives")
+        ballots[i, :len(row)] = row
+    if ballots.size and ballots.max() >= num_alternatives:
+        raise ValueError(f"alternative ids must be below {num_alternatives}")
+    return ballots
+
+
+def csv_chunks(file, num_alternatives, chunk_size=DEFAULT_CHUNK_SIZE):
+    """(ballots, counts) chunks of an open CSV file of rankings, every row being one voter."""
+    reader = csv.reader(file)
+    while True:
+        rows = [[int(cell) for cell in row if cell.strip()] for row in itertools.islice(reader, chunk_size)]
+        if not rows:
+            return
+        rows = [row for row in rows if row]
+        if rows:
+            yield _ballot_array(rows, num_alternatives), np.ones(len(rows), dtype=np.int64)
+
+
+def _preflib_data_line(line):
+    # 'count: a,b,c' (current format) or 'count,a,b,c' (legacy format), alternatives 1-based
+    if '{' in line:
+        raise ValueError("ballots with ties (.toc/.toi) are not supported")
+    if ':' in line:
+        count, ranking = line.split(':', 1)
+        ids = ranking.split(',')
+    else:
+        count, *ids = line.split(',')
+    return int(count), [int(alternative) - 1 for alternative in ids if alternative.strip()]
+
+
+def read_preflib_header(file):
+    """
+    Read the metadata of an open .soc/.soi file up to its first ballot line.
+    Returns (num_alternatives, alternative_names, first ballot line or None).
+    """
+    names = {}
+    first = file.readline()
+    if first.startswith('#'):
+        num_alternatives = None
+        line = first
+        while line and (line.startswith('#') or not line.strip()):
+            key, _, value = line[1:].partition(':')
+            key = key.strip()
+            if key == 'NUMBER ALTERNATIVES':
+                num_alternatives = int(value)
+            elif key.startswith('ALTERNATIVE NAME'):
+                names[int(key.split()[-1]) - 1] = value.strip()
+            line = file.readline()
+        if num_alternatives is None:
+            raise ValueError("PrefLib file without a NUMBER ALTERNATIVES line")
+        return num_alternatives, names, line or None
+
+    # legacy: m, m lines 'id,name', 'num_voters,sum_of_counts,num_unique', then the ballots
+    num_alternatives = int(first)
+    for _ in range(num_alternatives):
+        alternative, name = file.readline().split(',', 1)
+        names[int(alternative) - 1] = name.strip()
+    file.readline()
+    line = file.readline()
+    return num_alternatives, names, line or None
+
+
+def preflib_chunks(file, num_alternatives, first_line, chunk_size=DEFAULT_CHUNK_SIZE):
+    """(ballots, counts) chunks of the ballot lines of a PrefLib file, after read_preflib_header."""
+    lines = (line for line in itertools.chain([first_line] if first_line else [], file) if line.strip())
+    while True:
+        parsed = [_preflib_data_line(line) for line in itertools.islice(lines, chunk_size)]
+        if not parsed:
+            return
+        counts, rows = zip(*parsed)
+        yield _ballot_array(rows, num_alternatives), np.array(counts, dtype=np.int64)
+
+
+def ingest_file(path, num_alternatives=None, file_format=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                voting_schemes=VOTING_SCHEMES):
+    """
+    Read a ballot file in one pass into a BallotSummary. file_format ('csv', 'soc' or 'soi') defaults
+    to the file extension. For CSV files num_alternatives defaults to the number of columns of the
+    first row; PrefLib files declare it themselves.
+    """
+    if file_format is None:
+        file_format = os.path.splitext(path)[1].lstrip('.').lower()
+    with open(path, newline='') as file:
+        if file_format == 'csv':
+            if num_alternatives is None:
+                num_alternatives = len(next(csv.reader(file), []))
+                file.seek(0)
+            names = {}
+            chunks = csv_chunks(file, num_alternatives, chunk_size)
+        elif file_format in ('soc', 'soi'):
+            num_alternatives, names, first_line = read_preflib_header(file)
+            chunks = preflib_chunks(file, num_alternatives, first_line, chunk_size)
+        else:
+            raise ValueError(f"Unknown ballot file format: {file_format}")
+
+        summary = BallotSummary(num_alternatives, voting_schemes)
+        summary.alternative_names = names
+        for ballots, counts in chunks:
+            summary.add(ballots, counts)
+    return summary
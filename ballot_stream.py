@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+import numpy as np
+
+from electorate_growth import GrowingElectorate, compromise_bury_gains
+from risk import average_gain_risk, gain_percentile_risk, max_gain_risk, incentive_based_risk
+
+# Monitoring an election while its ballots arrive.
+# Ballot events (one ballot, or a (num_alternatives, k) batch) are read from an asyncio.Queue; the
+# score totals, election ranking and sincere happiness table are updated incrementally as each event
+# arrives (GrowingElectorate: happinesses are only recomputed when the ranking changes).
+# The risk.py metrics need a strategy search over the whole electorate, so every `risk_every` ballots
+# and/or `risk_interval` seconds they are computed in an executor on a copy of the current state and
+# published as a snapshot when done; ingest keeps running meanwhile. At most one computation is in
+# flight: schedule points reached while one runs are folded into the next one.
+
+
+def _risk_snapshot(voting_scheme, happiness_function, preferences, contributions, scores, happinesses):
+    gains = compromise_bury_gains(voting_scheme, preferences, contributions, scores, happiness_function, happinesses)
+    return {
+        'num_voters': preferences.shape[1],
+        'ranking': np.argsort(-scores, kind='stable'),
+        'scores': scores,
+        'overall_happiness': np.sum(happinesses) / max(len(happinesses), 1),
+        'incentive_based_risk': incentive_based_risk(gains) if len(gains) else 0,
+        'average_gain_risk': average_gain_risk(gains),
+        'gain_percentile_risk': gain_percentile_risk(gains),
+        'max_gain_risk': max_gain_risk(gains) if len(gains) else 0,
+        'time': time.time(),
+    }
+
+
+class BallotStreamMonitor:
+    """
+    Consumes ballot events from a queue (None ends the stream) and publishes risk snapshots
+    (dicts like GrowingElectorate.statistics plus 'ranking', 'scores' and 'time') to self.snapshots.
+    executor: where snapshots are computed, the event loop's default thread pool if None.
+    """
+
+    def __init__(self, voting_scheme, num_alternatives, happiness_function, risk_every=1000, risk_interval=None,
+                 executor=None):
+        self.electorate = GrowingElectorate(voting_scheme, num_alternatives, happiness_function)
+        self.risk_every = risk_every
+        self.risk_interval = risk_interval
+        self.executor = executor
+        self.snapshots = asyncio.Queue()
+        self.latest_snapshot = None
+        self._pending = None
+        self._ballots_since_risk = 0
+        self._last_risk_time = None
+
+    @property
+    def ranking(self):
+        return self.electorate.ranking()
+
+    @property
+    def happinesses(self):
+        return self.electorate.happinesses()
+
+    def add_ballots(self, ballots):
+        self.electorate.add_voters(ballots)
+        self.electorate.update_happinesses()
+        self._ballots_since_risk += np.asarray(ballots).reshape(self.electorate.num_alternatives, -1).shape[1]
+
+    def _risk_due(self, now):
+        if self._ballots_since_risk == 0:
+            return False
+        if self.risk_every is not None and self._ballots_since_risk >= self.risk_every:
+            return True
+        return self.risk_interval is not None and now - self._last_risk_time >= self.risk_interval
+
+    def _start_snapshot(self):
+        electorate = self.electorate
+        state = (
+            electorate.voting_scheme, electorate.happiness_function, electorate.preference_matrix.copy(),
+            electorate.contributions.copy(), electorate.scores.copy(), electorate.happinesses(),
+        )
+        self._ballots_since_risk = 0
+        self._last_risk_time = asyncio.get_running_loop().time()
+        self._pending = asyncio.get_running_loop().run_in_executor(self.executor, _risk_snapshot, *state)
+        self._pending.add_done_callback(self._publish)
+
+    def _publish(self, future):
+        self._pending = None
+        if future.cancelled():
+            return
+        self.latest_snapshot = future.result()
+        self.snapshots.put_nowait(self.latest_snapshot)
+
+    async def run(self, ballot_queue):
+        """Consume ballot_queue until None; returns the snapshot of the complete electorate."""
+        loop = asyncio.get_running_loop()
+        self._last_risk_time = loop.time()
+        while True:
+            ballots = await ballot_queue.get()
+            if ballots is None:
+                break
+            self.add_ballots(ballots)
+            if self._pending is None and self._risk_due(loop.time()):
+                self._start_snapshot()
+
+        if self._pending is not None:
+            await asyncio.wait([self._pending])
+        if self._ballots_since_risk or self.latest_snapshot is None:
+            self._start_snapshot()
+            await asyncio.wait([self._pending])
+        return self.latest_snapshot
+
+
+async def produce_ballots(ballot_queue, preference_matrix, batch_size=1, delay=0.0):
+    """Local producer: put the columns of preference_matrix on the queue in batches, then None."""
+    for start in range(0, preference_matrix.shape[1], batch_size):
+        await ballot_queue.put(preference_matrix[:, start:start + batch_size])
+        await asyncio.sleep(delay)
+    await ballot_queue.put(None)
+
+
+async def monitor_profile(voting_scheme, preference_matrix, happiness_function, batch_size=1, delay=0.0, **options):
+    """Stream a whole profile through a BallotStreamMonitor; returns (final snapshot, published snapshots)."""
+    ballot_queue = asyncio.Queue(maxsize=64)
+    monitor = BallotStreamMonitor(voting_scheme, preference_matrix.shape[0], happiness_function, **options)
+    producer = asyncio.create_task(produce_ballots(ballot_queue, preference_matrix, batch_size, delay))
+    final = await monitor.run(ballot_queue)
+    await producer
+    published = []
+    while not monitor.snapshots.empty():
+        published.append(monitor.snapshots.get_nowait())
+    return final, published
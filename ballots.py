@@ -0,0 +1,119 @@
+import numpy as np
+
+# Compact ballot storage shared by the BTVA variants.
+# A ballot matrix has shape (num_alternatives, num_voters) like every preference matrix in this repo,
+# but holds small signed integers instead of int64/float64:
+#   0 .. num_alternatives-1 -> alternative ids
+#   UNRANKED (-1)           -> slot intentionally left empty (bullet voting, truncated ballots)
+#   UNKNOWN (-2)            -> slot whose content is hidden from us (imperfect knowledge)
+UNRANKED = -1
+UNKNOWN = -2
+
+VOTING_SCHEMES = ('plurality', 'voting_for_two', 'anti_plurality', 'borda')
+
+
+def compact_dtype(num_alternatives):
+    """Smallest signed integer dtype that can hold every alternative id plus the sentinels."""
+    if num_alternatives <= np.iinfo(np.int8).max:
+        return np.dtype(np.int8)
+    if num_alternatives <= np.iinfo(np.int16).max:
+        return np.dtype(np.int16)
+    return np.dtype(np.int32)
+
+
+def to_compact(preference_matrix, num_alternatives=None):
+    """
+    Convert a preference matrix to the compact representation.
+    Float NaN entries and integer UNKNOWN (-2) entries become UNKNOWN, other negative entries become UNRANKED.
+    """
+    # asanyarray: a memory-mapped profile that is already compact stays a memmap (no copy)
+    preference_matrix = np.asanyarray(preference_matrix)
+    if num_alternatives is None:
+        num_alternatives = preference_matrix.shape[0]
+    dtype = compact_dtype(num_alternatives)
+    if preference_matrix.dtype == dtype:
+        return preference_matrix
+    if np.issubdtype(preference_matrix.dtype, np.floating):
+        unknown = np.isnan(preference_matrix)
+        compact = np.where(unknown, UNKNOWN, preference_matrix).astype(dtype)
+        compact[(compact < 0) & ~unknown] = UNRANKED
+        return compact
+    compact = preference_matrix.astype(dtype)
+    compact[(preference_matrix < 0) & (preference_matrix != UNKNOWN)] = UNRANKED
+    return compact
+
+
+def unknown_mask(ballots):
+    return np.asarray(ballots) == UNKNOWN
+
+
+def ranked_mask(ballots):
+    return np.asarray(ballots) >= 0
+
+
+## position weights of each scheme; anti-plurality is expressed as a base of 1 per voter minus the veto
+def positional_weights(voting_scheme, num_alternatives):
+    weights = np.zeros(num_alternatives)
+    if voting_scheme == 'plurality':
+        weights[0] = 1
+    elif voting_scheme == 'voting_for_two':
+        weights[:2] = 1
+    elif voting_scheme == 'anti_plurality':
+        weights[-1] = -1
+    elif voting_scheme == 'borda':
+        weights = np.arange(num_alternatives - 1, -1, -1, dtype=float)
+    else:
+        raise ValueError(f"Unknown voting scheme: {voting_scheme}")
+    return weights
+
+
+def base_score(voting_scheme):
+    return 1 if voting_scheme == 'anti_plurality' else 0
+
+
+def column_scores(ballots, voting_scheme, num_alternatives=None):
+    """
+    Score contribution of every ballot (column) separately.
+    Returns an array of shape (num_ballots, num_alternatives); unranked and unknown slots contribute nothing.
+    """
+    ballots = np.asarray(ballots)
+    if ballots.ndim == 1:
+        ballots = ballots[:, np.newaxis]
+    if num_alternatives is None:
+        num_alternatives = ballots.shape[0]
+    num_slots, num_ballots = ballots.shape
+    weights = positional_weights(voting_scheme, num_alternatives)[:num_slots]
+    contributions = np.full((num_ballots, num_alternatives), float(base_score(voting_scheme)))
+    for slot in np.flatnonzero(weights):
+        row = ballots[slot]
+        ranked = row >= 0
+        contributions[np.flatnonzero(ranked), row[ranked]] += weights[slot]
+    return contributions
+
+
+def tally(ballots, voting_scheme, num_alternatives=None):
+    """Total scores of a ballot matrix without any per-cell Python loop or float conversion of the ballots."""
+    ballots = np.asarray(ballots)
+    if num_alternatives is None:
+        num_alternatives = ballots.shape[0]
+    num_voters = ballots.shape[1]
+    weights = positional_weights(voting_scheme, num_alternatives)
+    scores = np.full(num_alternatives, float(base_score(voting_scheme) * num_voters))
+    for slot in np.flatnonzero(weights):
+        row = ballots[slot]
+        scores += weights[slot] * np.bincount(row[row >= 0], minlength=num_alternatives)
+    return scores
+
+
+def election_result(scores):
+    """Same [ranking, votes] layout the BTVA classes return."""
+    election_ranking = np.argsort(-scores, kind='stable')
+    votes = np.sort(-scores, kind='stable').astype(int) * (-1)
+    return np.vstack((election_ranking, votes))
+
+
+def missing_alternatives(ballot, num_alternatives):
+    """Alternatives that do not appear in the ranked slots of a single ballot, in increasing order."""
+    present = np.zeros(num_alternatives, dtype=bool)
+    present[ballot[ballot >= 0]] = True
+    return np.flatnonzero(~present)
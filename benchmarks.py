@@ -0,0 +1,205 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from functools import partial
+
+import numpy as np
+
+from b_plurality import BPlurality
+from b_anti_plurality import BAntiPlurality
+from b_voting_for_two import BVotingForTwo
+from b_borda import BBorda
+from atva4 import ATVA4
+from atva_voter_collusion import BTVA_Collusion
+from atva_imperfect_knowledge import BTVA_ImperfectInfo
+from happiness import distance_sensitive_happiness
+from profiles import impartial_culture
+from results_sink import git_revision
+from election_cache import get_election_cache
+from instrumentation import Stats
+
+# Seeded benchmarks of the election, happiness and strategy hot paths.
+# Every case builds its profile from a fixed seed, so two runs do the same work; it is timed (best of
+# `repeat` runs) and run once more under tracemalloc for the peak of Python/NumPy allocations.
+# Setup (profile, baseline election) is not measured, only the callable a case returns. The election
+# cache is cleared before every run, so repeats do not score each other's profiles from the cache.
+# "elections" is the instrumentation.Stats 'elections' counter of that run: every tally, and for the
+# imperfect-knowledge analysis every (completion, ballot) outcome scored, so it is comparable across
+# variants. Results are saved as a JSON baseline and a later run can be compared against it:
+#   python benchmarks.py --save baseline.json
+#   python benchmarks.py --baseline baseline.json --threshold 0.25
+BTVA_CLASSES = {
+    'plurality': BPlurality,
+    'anti_plurality': BAntiPlurality,
+    'voting_for_two': BVotingForTwo,
+    'borda': BBorda,
+}
+ELECTION_SIZES = [(5, 1000), (5, 100_000), (10, 100_000)]
+HAPPINESS_SIZES = [(5, 100), (5, 1000), (10, 1000)]
+STRATEGIC_SIZES = [(4, 10), (5, 20), (5, 50)]
+SEED = 2024
+
+
+def _profile(num_alternatives, num_voters, seed=SEED):
+    return impartial_culture(num_alternatives, num_voters, rng=seed)
+
+
+def _election(voting_scheme, num_alternatives, num_voters, stats=None):
+    btva = BTVA_CLASSES[voting_scheme](_profile(num_alternatives, num_voters), distance_sensitive_happiness, stats=stats)
+    return lambda: btva.run_non_strategic_election()
+
+
+def _happiness(voting_scheme, num_alternatives, num_voters, stats=None):
+    btva = BTVA_CLASSES[voting_scheme](_profile(num_alternatives, num_voters), distance_sensitive_happiness, stats=stats)
+    election_ranking = btva.run_non_strategic_election()[0]
+    return lambda: btva.calc_happinesses(election_ranking)
+
+
+def _strategic(voting_scheme, num_alternatives, num_voters, stats=None):
+    btva = BTVA_CLASSES[voting_scheme](_profile(num_alternatives, num_voters), distance_sensitive_happiness, stats=stats)
+    election_result = btva.run_non_strategic_election()
+    btva.non_strategic_happinesses = btva.calc_happinesses(election_result[0])
+    return lambda: btva.run_strategic_election(election_result)
+
+
+def _atva4(voting_scheme, num_alternatives, num_voters, stats=None):
+    atva4 = ATVA4(_profile(num_alternatives, num_voters), voting_scheme, stats=stats)
+
+    def run():
+        potential_change_in_happinesses, strategic_scenarios = atva4.run_potential_concurrent_strategic_elections()
+        atva4.run_final_concurrent_strategic_election(potential_change_in_happinesses, strategic_scenarios)
+    return run
+
+
+def _collusion(voting_scheme, num_alternatives, num_voters, group_size, stats=None):
+    btva = BTVA_Collusion(voting_scheme, _profile(num_alternatives, num_voters), stats=stats)
+    return lambda: btva.run_collusive_strategic_voting(group_size)
+
+
+def _imperfect_knowledge(voting_scheme, num_alternatives, num_voters, noise_level, stats=None):
+    btva = BTVA_ImperfectInfo(voting_scheme, _profile(num_alternatives, num_voters), noise_level=noise_level, rng=SEED,
+                              stats=stats)
+    basic_result = btva.run_non_strategic_election()
+    return lambda: btva.run_strategic_voting(basic_result)
+
+
+def benchmark_cases():
+    """{name: function(stats=None) returning the callable to measure}, built lazily."""
+    cases = {}
+    for voting_scheme in BTVA_CLASSES:
+        for m, n in ELECTION_SIZES:
+            cases[f'election/{voting_scheme}/{m}x{n}'] = partial(_election, voting_scheme, m, n)
+        for m, n in HAPPINESS_SIZES:
+            cases[f'happiness/{voting_scheme}/{m}x{n}'] = partial(_happiness, voting_scheme, m, n)
+        for m, n in STRATEGIC_SIZES:
+            cases[f'strategic/{voting_scheme}/{m}x{n}'] = partial(_strategic, voting_scheme, m, n)
+    for voting_scheme in ('plurality', 'borda'):
+        cases[f'atva4/{voting_scheme}/5x8'] = partial(_atva4, voting_scheme, 5, 8)
+        for group_size in (2, 3):
+            cases[f'collusion/{voting_scheme}/4x8/group{group_size}'] = partial(_collusion, voting_scheme, 4, 8, group_size)
+        for noise_level in (0.2, 0.3):
+            cases[f'imperfect/{voting_scheme}/5x8/noise{noise_level}'] = partial(
+                _imperfect_knowledge, voting_scheme, 5, 8, noise_level
+            )
+    return cases
+
+
+def measure(make_case, repeat=3):
+    """Wall time (best of repeat), tracemalloc peak and elections evaluated of one case."""
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            run = make_case()
+            get_election_cache().clear()
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+
+        stats = Stats()
+        run = make_case(stats=stats)
+        # the setup's own elections (baseline results) are not part of the case
+        stats.counters.clear()
+        get_election_cache().clear()
+        tracemalloc.start()
+        try:
+            run()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {'time': min(times), 'peak_memory': peak_memory, 'elections': stats.counters['elections']}
+
+
+def run_benchmarks(name_filter=None, repeat=3, progress=True):
+    results = {}
+    for name, make_case in benchmark_cases().items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = measure(make_case, repeat)
+        if progress:
+            print(f"{name:<45} {results[name]['time'] * 1e3:10.2f} ms {results[name]['peak_memory'] / 2**20:9.2f} MiB"
+                  f" {results[name]['elections']:>9} elections", flush=True)
+    return {
+        'metadata': {
+            'git_hash': git_revision(), 'python': platform.python_version(), 'numpy': np.__version__,
+            'platform': platform.platform(), 'seed': SEED, 'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def save_baseline(report, path):
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=2)
+
+
+def load_baseline(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(report, baseline, threshold=0.2, min_time_delta=0.002):
+    """
+    Cases whose time or peak memory grew by more than `threshold` (0.2 = 20%) over the baseline, and
+    cases whose election count changed (the same seeded work should evaluate the same elections).
+    Time differences below min_time_delta seconds are timer noise on millisecond cases, not regressions.
+    Returns a list of (name, metric, baseline value, new value).
+    """
+    regressions = []
+    for name, values in report['results'].items():
+        if name not in baseline['results']:
+            continue
+        old = baseline['results'][name]
+        for metric in ('time', 'peak_memory'):
+            if old[metric] > 0 and values[metric] > old[metric] * (1 + threshold):
+                if metric == 'time' and values[metric] - old[metric] < min_time_delta:
+                    continue
+                regressions.append((name, metric, old[metric], values[metric]))
+        if values['elections'] != old['elections']:
+            regressions.append((name, 'elections', old['elections'], values['elections']))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seeded benchmarks of the BTVA hot paths.")
+    parser.add_argument('--filter', help="only run cases whose name contains this text")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', help="write the results to this JSON baseline file")
+    parser.add_argument('--baseline', help="compare against this JSON baseline file")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed relative growth (default 0.2)")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.filter, args.repeat)
+    if args.save:
+        save_baseline(report, args.save)
+    if args.baseline:
+        regressions = compare(report, load_baseline(args.baseline), args.threshold)
+        for name, metric, old, new in regressions:
+            print(f"REGRESSION {name} {metric}: {old} -> {new}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions.")
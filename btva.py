@@ -1,19 +1,103 @@
 import numpy as np
 from helper_functions import print_side_by_side
+from ballots import to_compact, column_scores, election_result
+from election_cache import cached_tally
+from large_electorate import DEFAULT_CHUNK_SIZE, matrix_chunks, chunked_tally
+from instrumentation import instrumented
 
 class BTVA:
-    def __init__(self, preference_matrix, happiness_function):
-        self.preference_matrix = preference_matrix
+    # instrumentation.Stats collecting counters and phase times, None (off) by default
+    stats = None
+
+    def __init__(self, preference_matrix, happiness_function, chunk_size=None, threads=None, stats=None):
+        # ballots are kept as compact int8/int16 alternative ids, -1 marking unranked slots
+        self.preference_matrix = to_compact(preference_matrix)
         self.num_alternatives, self.num_voters = preference_matrix.shape
         self.non_strategic_happinesses = np.zeros(self.num_voters)
         self.happiness_function = happiness_function
+        # large-electorate mode: score in chunks of chunk_size voters on `threads` threads (see large_electorate.py);
+        # memory-mapped profiles (profile_store.py) are always scored in chunks so only a chunk of pages is touched at a time
+        if chunk_size is None and isinstance(self.preference_matrix, np.memmap):
+            chunk_size = DEFAULT_CHUNK_SIZE
+        self.chunk_size = chunk_size
+        self.threads = threads
+        self.stats = stats
+        self._sincere_scores = {}
     
     def run_non_strategic_election(self):
         pass
+
+    @instrumented('election', 'elections')
+    def tally(self, voting_scheme):
+        if self.chunk_size is None:
+            return cached_tally(self.preference_matrix, voting_scheme, self.num_alternatives, self.stats)
+        chunks = matrix_chunks(self.preference_matrix, self.chunk_size)
+        return chunked_tally(chunks, voting_scheme, self.num_alternatives, self.threads)
     
+    @instrumented('strategy_search')
     def run_strategic_election(self, election_result):
+        # the rules are anonymous, so voters with the same sincere ballot (and happiness) face the same
+        # best-response problem: it is solved once per group and copied to the other members
+        strategic_scenarios = [None] * self.num_voters
+        groups = self.ballot_groups()
+        if self.stats is not None:
+            self.stats.count('ballot_groups', len(groups))
+            self.stats.count('dedup_hits', self.num_voters - len(groups))
+        for members in groups:
+            scenario = self.run_voter_strategic_election(members[0], election_result)
+            if scenario is not None:
+                for voter in members:
+                    strategic_scenarios[voter] = self._scenario_for_voter(scenario, voter)
+        return strategic_scenarios
+
+    def run_voter_strategic_election(self, voter, election_result):
+        # best strategic scenario of one voter (None if they have no incentive); it names the ballot cast
+        # ('strategic ballot'), run_strategic_election adds the resulting preference matrix
         pass
+
+    def ballot_groups(self):
+        """Voter indices grouped by identical sincere ballot and happiness, in order of first appearance."""
+        groups = {}
+        for voter in range(self.num_voters):
+            key = (self.preference_matrix[:, voter].tobytes(), self.non_strategic_happinesses[voter])
+            groups.setdefault(key, []).append(voter)
+        return list(groups.values())
+
+    def sincere_scores(self, voting_scheme):
+        """Score totals of the sincere profile, tallied once per scheme and reused by every strategic ballot."""
+        if voting_scheme not in self._sincere_scores:
+            self._sincere_scores[voting_scheme] = self.tally(voting_scheme)
+        return self._sincere_scores[voting_scheme]
+
+    @instrumented('election', 'elections')
+    def strategic_election(self, voter, strategic_preference, strategy, voting_scheme):
+        """
+        Election result with the voter's ballot replaced (one ballot tried for `strategy`): the sincere
+        totals minus the voter's sincere ballot plus the strategic one, so no copy of the profile is made.
+        """
+        if self.stats is not None:
+            self.stats.count(f'ballots_tried.{strategy}')
+        ballots = np.column_stack((self.preference_matrix[:, voter], np.asarray(strategic_preference)))
+        sincere, strategic = column_scores(ballots, voting_scheme, self.num_alternatives)
+        return election_result(self.sincere_scores(voting_scheme) - sincere + strategic)
+
+    def strategic_matrix(self, voter, strategic_preference, strategy):
+        """Copy of the preference matrix with the voter's ballot replaced, for a scenario that is returned."""
+        if self.stats is not None:
+            self.stats.count(f'bytes_copied.{strategy}', self.preference_matrix.nbytes)
+            with self.stats.phase('matrix_copy'):
+                strategic_preference_matrix = np.copy(self.preference_matrix)
+        else:
+            strategic_preference_matrix = np.copy(self.preference_matrix)
+        strategic_preference_matrix[:, voter] = strategic_preference
+        return strategic_preference_matrix
+
+    def _scenario_for_voter(self, scenario, voter):
+        # the group's best move made by this member: identical outcome, the member's own column changed
+        strategic_preference_matrix = self.strategic_matrix(voter, scenario['strategic ballot'], scenario['strategy'])
+        return {**scenario, 'strategic preference matrix': strategic_preference_matrix}
     
+    @instrumented('happiness', 'happiness_calls', lambda self: self.num_voters)
     def calc_happinesses(self, election_ranking, preference_matrix=None):
         happinesses = np.zeros(self.num_voters)
         if preference_matrix is None:
@@ -22,6 +106,7 @@ class BTVA:
             happinesses[voter] = self.happiness_function(preference_matrix[:, voter], election_ranking)
         return happinesses
 
+    @instrumented('printing')
     def pretty_print_scenarios(self, strategic_scenarios, election_result):
         election_ranking, votes = election_result
         strategic_voters = [voter for voter, strategy in enumerate(strategic_scenarios) if strategy]
@@ -0,0 +1,116 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+from ballots import tally
+
+# Process-wide LRU cache of election scores.
+# The same preference matrices are scored over and over: ATVA4 reruns the baseline election in both of
+# its passes, the counter-strategic loop rebuilds a BTVA on the current matrix every round, and strategy
+# searches (ATVA4 combinations, collusion groups) try the same strategic matrices again. Scores are keyed
+# by (voting scheme, number of alternatives, shape, dtype, blake2b digest of the ballot bytes): hashing a
+# matrix is cheaper than tallying it, and a content key stays correct when a matrix is modified in place.
+# Every BTVA variant goes through cached_tally, so they all share the default cache; set_election_cache(None)
+# (or use_election_cache(None)) turns caching off. Chunked large-electorate tallies are not cached.
+DEFAULT_MAXSIZE = 4096
+
+
+def profile_key(preference_matrix, voting_scheme, num_alternatives=None):
+    preference_matrix = np.ascontiguousarray(preference_matrix)
+    if num_alternatives is None:
+        num_alternatives = preference_matrix.shape[0]
+    digest = hashlib.blake2b(preference_matrix.data, digest_size=16).digest()
+    return voting_scheme, num_alternatives, preference_matrix.shape, preference_matrix.dtype.str, digest
+
+
+class ElectionCache:
+    """Bounded LRU mapping profile_key -> scores, with hit/miss/eviction counts."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            scores = self._entries.get(key)
+            if scores is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return scores
+
+    def put(self, key, scores):
+        scores = np.array(scores)
+        scores.flags.writeable = False
+        with self._lock:
+            self._entries[key] = scores
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self), 'maxsize': self.maxsize, 'hit_rate': self.hit_rate}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+_default_cache = ElectionCache()
+
+
+def get_election_cache():
+    return _default_cache
+
+
+def set_election_cache(cache):
+    global _default_cache
+    previous = _default_cache
+    _default_cache = cache
+    return previous
+
+
+@contextmanager
+def use_election_cache(cache):
+    previous = set_election_cache(cache)
+    try:
+        yield cache
+    finally:
+        set_election_cache(previous)
+
+
+def cached_tally(preference_matrix, voting_scheme, num_alternatives=None, stats=None):
+    """ballots.tally through the default cache; stats (instrumentation.Stats) counts election_cache_hits/misses."""
+    cache = _default_cache
+    if cache is None:
+        return tally(preference_matrix, voting_scheme, num_alternatives)
+    key = profile_key(preference_matrix, voting_scheme, num_alternatives)
+    scores = cache.get(key)
+    if scores is None:
+        scores = tally(preference_matrix, voting_scheme, num_alternatives)
+        cache.put(key, scores)
+        if stats is not None:
+            stats.count('election_cache_misses')
+    elif stats is not None:
+        stats.count('election_cache_hits')
+    # callers get their own array, the cached one stays read-only
+    return scores.copy()
@@ -0,0 +1,138 @@
+import numpy as np
+
+from ballots import compact_dtype, to_compact, column_scores
+from risk import average_gain_risk, gain_percentile_risk, max_gain_risk, incentive_based_risk
+
+# One profile grown voter batch by voter batch.
+# The score totals are updated with each batch's contributions and sincere happinesses are only
+# recomputed when the election ranking changes (otherwise only the new voters are evaluated).
+# The counter-strategic num_voters sweep (run_num_voters_sweep) carries its sincere state from size to
+# size this way and ballot_stream.BallotStreamMonitor follows an election as ballots arrive.
+# statistics() reports risk.py measures of a compromise/bury-only proxy (compromise_bury_gains),
+# not the strategic_voting_risk of the counter-strategic dynamics.
+
+
+class GrowingElectorate:
+    def __init__(self, voting_scheme, num_alternatives, happiness_function, batch_happiness_function=None):
+        self.voting_scheme = voting_scheme
+        self.num_alternatives = num_alternatives
+        self.happiness_function = happiness_function
+        # optional vectorized form: (voter preferences as rows, ranking) -> their happinesses
+        self.batch_happiness_function = batch_happiness_function
+        self.num_voters = 0
+        # storage grows by doubling, the first num_voters columns/rows are in use
+        self._preferences = np.empty((num_alternatives, 16), dtype=compact_dtype(num_alternatives))
+        self._contributions = np.empty((16, num_alternatives))
+        self.scores = np.zeros(num_alternatives)
+        # sincere happinesses (list, grows with the electorate) and the ranking they were computed for
+        self._happinesses = []
+        self._happiness_ranking = None
+
+    @property
+    def preference_matrix(self):
+        return self._preferences[:, :self.num_voters]
+
+    @property
+    def contributions(self):
+        return self._contributions[:self.num_voters]
+
+    def add_voters(self, columns):
+        """Append voter columns (shape (num_alternatives, k)) and update the score totals."""
+        columns = to_compact(np.asarray(columns).reshape(self.num_alternatives, -1), self.num_alternatives)
+        contributions = column_scores(columns, self.voting_scheme, self.num_alternatives)
+        new_size = self.num_voters + columns.shape[1]
+        if new_size > self._preferences.shape[1]:
+            capacity = max(new_size, 2 * self._preferences.shape[1])
+            preferences = np.empty((self.num_alternatives, capacity), dtype=self._preferences.dtype)
+            preferences[:, :self.num_voters] = self.preference_matrix
+            all_contributions = np.empty((capacity, self.num_alternatives))
+            all_contributions[:self.num_voters] = self.contributions
+            self._preferences, self._contributions = preferences, all_contributions
+        self._preferences[:, self.num_voters:new_size] = columns
+        self._contributions[self.num_voters:new_size] = contributions
+        self.scores = self.scores + contributions.sum(axis=0)
+        self.num_voters = new_size
+        return self
+
+    def ranking(self, scores=None):
+        if scores is None:
+            scores = self.scores
+        return np.argsort(-scores, axis=-1, kind='stable')
+
+    def update_happinesses(self):
+        """Bring the sincere happiness table up to date: only new voters, unless the ranking changed."""
+        ranking = self.ranking()
+        if self._happiness_ranking is None or not np.array_equal(ranking, self._happiness_ranking):
+            self._happinesses = []
+            self._happiness_ranking = ranking
+        new_voters = self.preference_matrix[:, len(self._happinesses):]
+        if self.batch_happiness_function is not None:
+            self._happinesses.extend(self.batch_happiness_function(new_voters.T, ranking))
+        else:
+            self._happinesses.extend(self.happiness_function(column, ranking) for column in new_voters.T)
+
+    def happinesses(self):
+        """Sincere happiness of every voter under the current election ranking."""
+        self.update_happinesses()
+        return np.array(self._happinesses, dtype=float)
+
+    def strategic_gains(self):
+        """
+        Relative gain (as in BTVA.calc_strategic_gains) of each voter's best compromise/bury move,
+        see compromise_bury_gains.
+        """
+        return compromise_bury_gains(
+            self.voting_scheme, self.preference_matrix, self.contributions, self.scores,
+            self.happiness_function, self.happinesses()
+        )
+
+    def statistics(self):
+        """Happiness and the risk.py measures of the compromise/bury proxy for the current electorate."""
+        happinesses = self.happinesses()
+        gains = self.strategic_gains()
+        return {
+            'num_voters': self.num_voters,
+            'winner': self.ranking()[0],
+            'overall_happiness': np.sum(happinesses) / self.num_voters,
+            'incentive_based_risk': incentive_based_risk(gains),
+            'average_gain_risk': average_gain_risk(gains),
+            'gain_percentile_risk': gain_percentile_risk(gains),
+            'max_gain_risk': max_gain_risk(gains),
+        }
+
+
+def compromise_bury_gains(voting_scheme, preference_matrix, contributions, scores, happiness_function,
+                          sincere_happinesses):
+    """
+    Relative gain (as in BTVA.calc_strategic_gains) of the best compromise/bury move of each column
+    of preference_matrix: an alternative the voter prefers to the winner is put first and the winner
+    last, like BPlurality.run_strategic_election, here tried for every preferred alternative.
+    `contributions` are the columns' current score contributions and `scores` the election totals;
+    all moves are scored against them in one batch.
+    """
+    m, num_columns = preference_matrix.shape
+    preferences = preference_matrix.T.astype(np.intp)
+    ranking = np.argsort(-scores, kind='stable')
+    winner = ranking[0]
+
+    # sort keys of the moved ballots: sincere positions, contender -> front, winner -> back
+    positions = np.argsort(preferences, axis=1)
+    keys = np.repeat(positions[:, np.newaxis, :], m, axis=1)
+    contenders = np.arange(m)
+    keys[:, contenders, contenders] = -1
+    keys[:, :, winner] = m
+    ballots = np.argsort(keys, axis=2)
+    move_contributions = column_scores(ballots.reshape(-1, m).T, voting_scheme, m).reshape(num_columns, m, m)
+    totals = scores + (move_contributions - contributions[:, np.newaxis, :])
+    new_rankings = np.argsort(-totals, axis=-1, kind='stable')
+
+    # only alternatives preferred to the winner, and only moves that change the outcome
+    preferred = positions < positions[:, [winner]]
+    changed = preferred & np.any(new_rankings != ranking, axis=2)
+    gains = np.zeros(num_columns)
+    for column, contender in zip(*np.nonzero(changed)):
+        strategic = happiness_function(preference_matrix[:, column], new_rankings[column, contender])
+        if strategic > sincere_happinesses[column]:
+            gains[column] = max(gains[column], (strategic - sincere_happinesses[column]) / strategic)
+    return gains
+
@@ -4,9 +4,10 @@ import matplotlib.pyplot as plt
 import tqdm
 from btva import BTVA  
 from happiness import binary_happiness 
+from profiles import impartial_culture
 
 def generate_random_preferences_matrix(num_alternatives, num_voters):
-    return np.array([np.random.permutation(num_alternatives) for _ in range(num_voters)]).T
+    return impartial_culture(num_alternatives, num_voters, rng=np.random)
 
     
 def run_non_strategic_election(self):
@@ -1,9 +1,14 @@
 import numpy as np
+from profiles import impartial_culture
 
-def generate_random_preferences_matrix(num_alternatives, num_voters):
-    return np.array([np.random.permutation(num_alternatives) for _ in range(num_voters)]).T
+def generate_random_preferences_matrix(num_alternatives, num_voters, rng=None):
+    # impartial culture (see profiles.py); rng: np.random.Generator (or seed), the global np.random state if None
+    return impartial_culture(num_alternatives, num_voters, rng=np.random if rng is None else rng)
     
 def print_side_by_side(A, B):
+    print(format_side_by_side(A, B))
+
+def format_side_by_side(A, B):
     # Convert A and B into their string representations line by line
     A_str = str(A).splitlines()
     B_str = str(B).splitlines()
@@ -19,11 +24,13 @@ def print_side_by_side(A, B):
     # Calculate the "middle" line
     mid_line_idx = n_lines // 2
     
-    # Print line by line
+    # Build line by line
+    lines = []
     for i, (left_line, right_line) in enumerate(zip(A_str, B_str)):
         if i == mid_line_idx:
-            # Only print " -> " in the middle line
-            print(left_line.ljust(left_width) + " -> " + right_line)
+            # Only put " -> " in the middle line
+            lines.append(left_line.ljust(left_width) + " -> " + right_line)
         else:
-            # Print spacing on non-middle lines
-            print(left_line.ljust(left_width) + "    " + right_line)
\ No newline at end of file
+            # Spacing on non-middle lines
+            lines.append(left_line.ljust(left_width) + "    " + right_line)
+    return "\n".join(lines)
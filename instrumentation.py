@@ -0,0 +1,200 @@
+import functools
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Opt-in counters and phase timers for the BTVA classes.
+# An instance created with stats=Stats() records what its hot paths do; with stats=None (the default)
+# an instrumented method costs one wrapper call and an `is None` check. Counters are plain integers, phases
+# accumulate perf_counter_ns durations and call counts. Phases nest (a strategy search contains the
+# elections it runs), so phase times are inclusive. Stats objects are picklable and merge by addition,
+# so workers can send theirs back to be combined.
+#
+# Stats(memory=True) also records memory per phase (phases and counters are the same as without it):
+#   phase_peak_bytes   largest tracemalloc peak of a call, above what was allocated when it started
+#   phase_rss_growth   largest rise of the process' peak RSS during a call (the phase that set a new high)
+#   memory_sites       top allocation sites (file:line, bytes, blocks) of the memory still alive at the
+#                      end of the call that set a phase's peak, e.g. the strategic matrices kept by a search
+# tracemalloc is started if needed and slows Python allocations down, so memory mode is for diagnosis.
+#
+# Counters used by the BTVA classes:
+#   elections              elections scored (strategic elections included)
+#   happiness_calls        happiness function evaluations
+#   ballots_tried.<name>   strategic ballots tried per strategy
+#   bytes_copied.<name>    bytes of the strategic matrices built for the returned scenarios, per strategy
+#   ballot_groups          per-voter strategy searches actually run
+#   dedup_hits             voters served by another voter's search (same ballot)
+#   cache_hits/misses      column completion cache (imperfect knowledge)
+#   election_cache_hits/misses  election scores served by / added to the election_cache.py LRU
+# Phases: election, happiness, strategy_search, matrix_copy, completion, all_completions,
+#         concurrent_enumeration, concurrent_final, printing
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes (0 where the platform does not report it)."""
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class Stats:
+    def __init__(self, memory=False, top_sites=10):
+        self.counters = Counter()
+        self.phase_ns = Counter()
+        self.phase_calls = Counter()
+        self.memory = memory
+        self.top_sites = top_sites
+        self.phase_peak_bytes = Counter()
+        self.phase_rss_growth = Counter()
+        self.peak_rss = 0
+        self.memory_sites = {}
+        # open phases in memory mode: [traced bytes at start, peak so far, peak RSS at start]
+        self._open_phases = []
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    @contextmanager
+    def phase(self, name):
+        frame = self._enter_memory() if self.memory else None
+        start = time.perf_counter_ns()
+        try:
+            yield self
+        finally:
+            self.phase_ns[name] += time.perf_counter_ns() - start
+            self.phase_calls[name] += 1
+            if frame is not None:
+                self._exit_memory(name, frame)
+
+    def _enter_memory(self):
+        if not tracemalloc.is_tracing():
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        # the global peak is reset for this phase; the enclosing phases keep what they saw so far
+        for frame in self._open_phases:
+            frame[1] = max(frame[1], peak)
+        tracemalloc.reset_peak()
+        frame = [current, current, peak_rss()]
+        self._open_phases.append(frame)
+        return frame
+
+    def _exit_memory(self, name, frame):
+        _, peak = tracemalloc.get_traced_memory()
+        self._open_phases.remove(frame)
+        frame[1] = max(frame[1], peak)
+        for outer in self._open_phases:
+            outer[1] = max(outer[1], frame[1])
+        rss = peak_rss()
+        self.peak_rss = max(self.peak_rss, rss)
+        self.phase_rss_growth[name] = max(self.phase_rss_growth[name], rss - frame[2])
+        phase_peak = frame[1] - frame[0]
+        if phase_peak > self.phase_peak_bytes[name]:
+            self.phase_peak_bytes[name] = phase_peak
+            self.memory_sites[name] = self._allocation_sites()
+
+    def _allocation_sites(self):
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        ])
+        return [
+            (f"{statistic.traceback[0].filename}:{statistic.traceback[0].lineno}", statistic.size, statistic.count)
+            for statistic in snapshot.statistics('lineno')[:self.top_sites]
+        ]
+
+    def merge(self, other):
+        """Add another Stats (e.g. from a worker process) into this one; memory peaks take the maximum."""
+        self.counters.update(other.counters)
+        self.phase_ns.update(other.phase_ns)
+        self.phase_calls.update(other.phase_calls)
+        for name, peak in other.phase_peak_bytes.items():
+            if peak > self.phase_peak_bytes[name]:
+                self.phase_peak_bytes[name] = peak
+                self.memory_sites[name] = other.memory_sites.get(name, [])
+        for name, growth in other.phase_rss_growth.items():
+            self.phase_rss_growth[name] = max(self.phase_rss_growth[name], growth)
+        self.peak_rss = max(self.peak_rss, other.peak_rss)
+        return self
+
+    def as_dict(self):
+        return {
+            'counters': dict(self.counters),
+            'phase_ns': dict(self.phase_ns),
+            'phase_calls': dict(self.phase_calls),
+            'phase_peak_bytes': dict(self.phase_peak_bytes),
+            'phase_rss_growth': dict(self.phase_rss_growth),
+            'peak_rss': self.peak_rss,
+            'memory_sites': {name: [list(site) for site in sites] for name, sites in self.memory_sites.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, values):
+        stats = cls()
+        stats.counters.update(values.get('counters', {}))
+        stats.phase_ns.update(values.get('phase_ns', {}))
+        stats.phase_calls.update(values.get('phase_calls', {}))
+        stats.phase_peak_bytes.update(values.get('phase_peak_bytes', {}))
+        stats.phase_rss_growth.update(values.get('phase_rss_growth', {}))
+        stats.peak_rss = values.get('peak_rss', 0)
+        stats.memory_sites = {name: [tuple(site) for site in sites] for name, sites in values.get('memory_sites', {}).items()}
+        return stats
+
+    def report(self):
+        lines = [f"{'phase':<24}{'calls':>10}{'total ms':>14}{'mean us':>12}"]
+        for name, total in self.phase_ns.most_common():
+            calls = self.phase_calls[name]
+            lines.append(f"{name:<24}{calls:>10}{total / 1e6:>14.2f}{total / calls / 1e3:>12.2f}")
+        lines.append("")
+        lines.append(f"{'counter':<36}{'value':>12}")
+        for name in sorted(self.counters):
+            lines.append(f"{name:<36}{self.counters[name]:>12}")
+        if self.phase_peak_bytes or self.peak_rss:
+            lines.append("")
+            lines.append(f"peak RSS: {self.peak_rss / 2**20:.1f} MiB")
+            lines.append(f"{'phase':<24}{'peak MiB':>12}{'RSS growth MiB':>16}")
+            for name, peak in self.phase_peak_bytes.most_common():
+                lines.append(f"{name:<24}{peak / 2**20:>12.3f}{self.phase_rss_growth[name] / 2**20:>16.1f}")
+            for name, peak in self.phase_peak_bytes.most_common():
+                lines.append("")
+                lines.append(f"top allocation sites at the {name} peak:")
+                for site, size, count in self.memory_sites.get(name, []):
+                    lines.append(f"  {size / 2**20:10.3f} MiB {count:>8} blocks  {site}")
+        return "\n".join(lines)
+
+
+def merge_stats(stats_list):
+    """One Stats with the sum of all of them."""
+    merged = Stats()
+    for stats in stats_list:
+        merged.merge(stats)
+    return merged
+
+
+def instrumented(phase, counter=None, amount=None):
+    """
+    Method decorator: when self.stats is set, time the call as `phase` and add amount(self) (1 by
+    default) to `counter`; when it is None the method runs directly.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            stats = self.stats
+            if stats is None:
+                return method(self, *args, **kwargs)
+            if counter is not None:
+                stats.count(counter, 1 if amount is None else amount(self))
+            with stats.phase(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,69 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import partial
+
+import numpy as np
+
+from ballots import tally
+from profiles import impartial_culture
+
+# Scoring electorates too large to hold (or to loop over) at once.
+# The voters are split into fixed-size chunks of compact ballots; every chunk is tallied on its own
+# and the partial score vectors are summed. Chunks are tallied in a thread pool: the NumPy kernels
+# doing the work (bincount, sorting for the synthetic generators) release the GIL, so threads scale
+# with cores without copying ballots to other processes. At most a few chunks per thread are alive
+# at any time, which bounds memory by the chunk size rather than by the electorate.
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def matrix_chunks(preference_matrix, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Column slices (views, no copies) of a (num_alternatives, num_voters) matrix, e.g. a memmap."""
+    num_voters = preference_matrix.shape[1]
+    return [preference_matrix[:, start:start + chunk_size] for start in range(0, num_voters, chunk_size)]
+
+
+def synthetic_chunks(num_alternatives, num_voters, chunk_size=DEFAULT_CHUNK_SIZE, seed=None,
+                     generator=impartial_culture, **generator_kwargs):
+    """
+    Zero-argument callables each drawing one chunk of a synthetic electorate with a profiles.py
+    generator, so the chunk is only built inside the worker that tallies it. Every chunk has its own
+    SeedSequence spawned from `seed` and builds a fresh RNG from it on each call: the electorate does not
+    depend on the number of threads, and tallying the same chunk list again draws the same ballots.
+    """
+    sizes = [min(chunk_size, num_voters - start) for start in range(0, num_voters, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    return [
+        partial(generator, num_alternatives, size, rng=chunk_seed, **generator_kwargs)
+        for size, chunk_seed in zip(sizes, seeds)
+    ]
+
+
+def _tally_chunk(chunk, voting_scheme, num_alternatives):
+    ballots = chunk() if callable(chunk) else chunk
+    return tally(ballots, voting_scheme, num_alternatives)
+
+
+def chunked_tally(chunks, voting_scheme, num_alternatives, threads=None):
+    """
+    Total scores over `chunks` (ballot matrices or callables returning one, see matrix_chunks and
+    synthetic_chunks). threads=1 tallies in this thread; otherwise a pool of `threads` threads
+    (os.cpu_count() by default) keeps at most two chunks per thread in flight.
+    """
+    scores = np.zeros(num_alternatives)
+    if threads == 1:
+        for chunk in chunks:
+            scores += _tally_chunk(chunk, voting_scheme, num_alternatives)
+        return scores
+
+    threads = threads or os.cpu_count()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pending = set()
+        for chunk in chunks:
+            if len(pending) >= 2 * threads:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    scores += future.result()
+            pending.add(executor.submit(_tally_chunk, chunk, voting_scheme, num_alternatives))
+        for future in pending:
+            scores += future.result()
+    return scores
@@ -0,0 +1,67 @@
+import struct
+
+import numpy as np
+
+from ballots import compact_dtype, to_compact
+
+# Preference profiles stored on disk and memory-mapped.
+# File layout (little-endian):
+#   bytes  0..7   magic b'TVAPROF1'
+#   bytes  8..23  ballot dtype as a NumPy type string (e.g. '|i1'), NUL padded
+#   bytes 24..31  num_alternatives (uint64)
+#   bytes 32..39  num_voters (uint64)
+#   bytes 40..63  reserved (zero)
+#   bytes 64..    ballots, voter-major: num_voters rows of num_alternatives compact entries (best first)
+# Voter-major means one voter's ballot is contiguous, and so is any range of voters: per-voter code
+# and chunked scoring (large_electorate.py) only touch the pages they need. open_profile returns the
+# (num_alternatives, num_voters) matrix the BTVA classes expect as a transposed view of the mapping,
+# so no copy is made, and processes opening the same file share it through the OS page cache.
+MAGIC = b'TVAPROF1'
+HEADER = struct.Struct('<8s16sQQ24x')
+
+
+def read_header(path):
+    """(dtype, num_alternatives, num_voters) of a profile file."""
+    with open(path, 'rb') as file:
+        header = file.read(HEADER.size)
+    if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a profile file")
+    _, dtype, num_alternatives, num_voters = HEADER.unpack(header)
+    return np.dtype(dtype.rstrip(b'\0').decode()), num_alternatives, num_voters
+
+
+def create_profile(path, num_alternatives, num_voters, dtype=None):
+    """
+    New profile file, returned as a writable (num_alternatives, num_voters) view to be filled in
+    (e.g. chunk by chunk); the ballots start out as zeros.
+    """
+    dtype = compact_dtype(num_alternatives) if dtype is None else np.dtype(dtype)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, dtype.str.encode(), num_alternatives, num_voters))
+    if num_voters == 0:
+        return np.empty((num_alternatives, 0), dtype=dtype)
+    mapped = np.memmap(path, dtype=dtype, mode='r+', offset=HEADER.size, shape=(num_voters, num_alternatives))
+    return mapped.T
+
+
+def write_profile(path, preference_matrix, chunk_size=1 << 20):
+    """Store a (num_alternatives, num_voters) matrix, converted to compact ballots chunk by chunk."""
+    num_alternatives, num_voters = preference_matrix.shape
+    profile = create_profile(path, num_alternatives, num_voters)
+    for start in range(0, num_voters, chunk_size):
+        profile[:, start:start + chunk_size] = to_compact(preference_matrix[:, start:start + chunk_size], num_alternatives)
+    if isinstance(profile, np.memmap):
+        profile.flush()
+    return path
+
+
+def open_profile(path, mode='r'):
+    """
+    Memory-mapped (num_alternatives, num_voters) matrix of a profile file. mode='r' is read-only,
+    'r+' writes changes back to the file, 'c' is copy-on-write.
+    """
+    dtype, num_alternatives, num_voters = read_header(path)
+    if num_voters == 0:
+        return np.empty((num_alternatives, 0), dtype=dtype)
+    mapped = np.memmap(path, dtype=dtype, mode=mode, offset=HEADER.size, shape=(num_voters, num_alternatives))
+    return mapped.T
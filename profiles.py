@@ -0,0 +1,100 @@
+import numpy as np
+
+from ballots import compact_dtype
+
+# Preference-profile generators.
+# Every generator returns a (num_alternatives, num_voters) matrix whose columns are rankings (best
+# first), or a (num_profiles, num_alternatives, num_voters) batch when num_profiles is given.
+# `rng` is a np.random.Generator or a seed (None: fresh entropy); passing the np.random module itself
+# draws from the legacy global state, so code seeded with np.random.seed keeps working.
+
+
+def _generator(rng):
+    if rng is np.random:
+        return np.random
+    return np.random.default_rng(rng)
+
+
+def _profiles(rankings, num_alternatives, num_profiles):
+    # rankings: (num_profiles * num_voters, num_alternatives) or (num_profiles, num_voters, num_alternatives)
+    rankings = rankings.reshape(num_profiles or 1, -1, num_alternatives).transpose(0, 2, 1)
+    rankings = rankings.astype(compact_dtype(num_alternatives))
+    return rankings if num_profiles is not None else rankings[0]
+
+
+def impartial_culture(num_alternatives, num_voters, rng=None, num_profiles=None):
+    """Every ranking equally likely, drawn as the argsort of a uniform random matrix."""
+    rng = _generator(rng)
+    shape = (num_voters, num_alternatives) if num_profiles is None else (num_profiles, num_voters, num_alternatives)
+    return _profiles(np.argsort(rng.random(shape), axis=-1), num_alternatives, num_profiles)
+
+
+def mallows(num_alternatives, num_voters, phi, reference=None, rng=None, num_profiles=None):
+    """
+    Mallows model around `reference` (identity by default) with dispersion phi in [0, 1]:
+    phi=0 gives only the reference ranking, phi=1 is impartial culture.
+    Sampled with the repeated insertion model, one insertion step for all voters at a time.
+    """
+    rng = _generator(rng)
+    reference = np.arange(num_alternatives) if reference is None else np.asarray(reference)
+    num_rankings = num_voters * (num_profiles or 1)
+
+    # positions[:, i] = current position of reference[i] among the alternatives inserted so far
+    positions = np.zeros((num_rankings, num_alternatives), dtype=np.intp)
+    for i in range(1, num_alternatives):
+        # inserting the i-th alternative at position j displaces it by i - j
+        weights = phi ** (i - np.arange(i + 1, dtype=float))
+        insert_at = rng.choice(i + 1, size=num_rankings, p=weights / weights.sum())
+        positions[:, :i] += positions[:, :i] >= insert_at[:, np.newaxis]
+        positions[:, i] = insert_at
+    rankings = reference[np.argsort(positions, axis=1)]
+    return _profiles(rankings, num_alternatives, num_profiles)
+
+
+def urn(num_alternatives, num_voters, alpha, rng=None, num_profiles=None):
+    """
+    Polya-Eggenberger urn: the urn starts with one copy of every ranking and every drawn ranking is
+    returned with alpha * num_alternatives! extra copies. Voter k therefore draws a fresh
+    impartial-culture ranking with probability 1 / (1 + k * alpha) and otherwise copies one of the
+    k earlier voters at random. alpha=0 is impartial culture.
+    """
+    rng = _generator(rng)
+    batch = num_profiles or 1
+    fresh = impartial_culture(num_alternatives, num_voters, rng=rng, num_profiles=batch)
+
+    voters = np.arange(num_voters)
+    draws_fresh = rng.random((batch, num_voters)) < 1 / (1 + voters * alpha)
+    # copy source: a uniformly chosen earlier voter (voter 0 always draws fresh)
+    source = np.floor(rng.random((batch, num_voters)) * voters).astype(np.intp)
+    origin = np.where(draws_fresh, voters, source)
+    # follow copies of copies back to the voter that drew fresh
+    while True:
+        followed = np.take_along_axis(origin, origin, axis=1)
+        if np.array_equal(followed, origin):
+            break
+        origin = followed
+    profiles = np.take_along_axis(fresh, origin[:, np.newaxis, :], axis=2)
+    return profiles if num_profiles is not None else profiles[0]
+
+
+def single_peaked(num_alternatives, num_voters, axis=None, rng=None, num_profiles=None):
+    """
+    Uniformly random rankings single-peaked on `axis` (identity order by default), built from the
+    bottom (Walsh): the last place goes to one of the two ends of the remaining axis interval, each
+    with probability 1/2, until only the peak is left.
+    """
+    rng = _generator(rng)
+    axis = np.arange(num_alternatives) if axis is None else np.asarray(axis)
+    num_rankings = num_voters * (num_profiles or 1)
+
+    take_left = rng.random((num_rankings, max(num_alternatives - 1, 0))) < 0.5
+    left = np.zeros(num_rankings, dtype=np.intp)
+    right = np.full(num_rankings, num_alternatives - 1, dtype=np.intp)
+    rankings = np.empty((num_rankings, num_alternatives), dtype=np.intp)
+    for place in range(num_alternatives - 1, 0, -1):
+        take = take_left[:, place - 1]
+        rankings[:, place] = np.where(take, left, right)
+        left += take
+        right -= ~take
+    rankings[:, 0] = left
+    return _profiles(axis[rankings], num_alternatives, num_profiles)
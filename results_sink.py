@@ -0,0 +1,143 @@
+import csv
+import os
+import subprocess
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Experiment results on disk.
+# Rows are buffered in memory and appended to a CSV file in batches. The first line of the file is a
+# schema comment (`# schema: name:type,...`) followed by the usual CSV header, so a results file can
+# be loaded with one pd.read_csv call with the right dtypes. Every row carries the run metadata below.
+# Column types are declared up front where known ({name: type} columns); a numeric column left
+# undeclared is written as float, since its first rows may hold int literals (e.g. a risk of 0).
+SCHEMA_PREFIX = '# schema: '
+METADATA_COLUMNS = ('voting_scheme', 'num_voters', 'num_alternatives', 'seed', 'git_hash')
+METADATA_TYPES = {'voting_scheme': 'str', 'num_voters': 'int', 'num_alternatives': 'int', 'seed': 'int', 'git_hash': 'str'}
+_DTYPES = {'int': 'Int64', 'float': 'float64', 'str': 'string'}
+
+
+@lru_cache(maxsize=None)
+def git_revision():
+    """Short hash of the checked-out commit, or 'unknown' outside a git checkout."""
+    try:
+        output = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True
+        )
+        return output.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def _type_name(value):
+    if isinstance(value, (bool, np.bool_)):
+        return 'str'
+    if isinstance(value, (int, np.integer)):
+        return 'int'
+    if isinstance(value, (float, np.floating)):
+        return 'float'
+    return 'str'
+
+
+def read_schema(path):
+    """Column types from the schema line of a results file, or None for a plain CSV."""
+    with open(path, newline='') as file:
+        first_line = file.readline().rstrip('\r\n')
+    if not first_line.startswith(SCHEMA_PREFIX):
+        return None
+    return dict(field.rsplit(':', 1) for field in first_line[len(SCHEMA_PREFIX):].split(','))
+
+
+def load_results(path):
+    """
+    All rows of a results file as a DataFrame, in one vectorized read.
+    Plain CSV files without a schema line (like the older results*.csv) load as well.
+    """
+    schema = read_schema(path)
+    if schema is None:
+        return pd.read_csv(path)
+    return pd.read_csv(path, skiprows=1, dtype={name: _DTYPES[kind] for name, kind in schema.items()})
+
+
+class ResultsSink:
+    """
+    Buffered writer for one results file.
+
+    `columns` are the measured values of a row, a list of names or a {name: 'int'/'float'/'str'} dict;
+    the metadata columns come first. Values missing from a row are taken from `metadata` (e.g. a seed
+    shared by the whole run); the git hash is filled in automatically. Rows are written every
+    `buffer_size` rows and when the sink is flushed or closed. Undeclared columns are typed from the
+    first batch written to a new file, numbers as float; appending to an existing file requires the
+    same columns.
+    """
+
+    def __init__(self, path, columns, metadata=None, buffer_size=1000):
+        self.path = path
+        self.columns = list(METADATA_COLUMNS) + [column for column in columns if column not in METADATA_COLUMNS]
+        self.column_types = {**METADATA_TYPES, **(columns if isinstance(columns, dict) else {})}
+        self.metadata = {'git_hash': git_revision()}
+        self.metadata.update(metadata or {})
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.rows_written = 0
+
+        if os.path.isfile(path) and os.path.getsize(path) > 0:
+            schema = read_schema(path)
+            if schema is None or list(schema) != self.columns:
+                raise ValueError(f"{path} has different columns than {self.columns}")
+
+    def write(self, **values):
+        unknown = set(values) - set(self.columns)
+        if unknown:
+            raise ValueError(f"Unknown result columns: {sorted(unknown)}")
+        row = {**self.metadata, **values}
+        self.buffer.append([row.get(column) for column in self.columns])
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def has_rows(self):
+        """Whether any row is buffered or already in the file (beyond the schema and header lines)."""
+        if self.buffer or self.rows_written:
+            return True
+        if not os.path.isfile(self.path):
+            return False
+        with open(self.path, newline='') as file:
+            for _ in range(2):
+                file.readline()
+            return bool(file.readline())
+
+    def flush(self):
+        if not self.buffer:
+            return
+        new_file = not os.path.isfile(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, 'a', newline='') as file:
+            if new_file:
+                file.write(SCHEMA_PREFIX + ','.join(
+                    f"{column}:{self._column_type(index)}" for index, column in enumerate(self.columns)
+                ) + '\n')
+            writer = csv.writer(file)
+            if new_file:
+                writer.writerow(self.columns)
+            writer.writerows(self.buffer)
+        self.rows_written += len(self.buffer)
+        self.buffer = []
+
+    def _column_type(self, index):
+        # declared type, else str if any buffered value is a string and float otherwise: an int-looking
+        # first batch says nothing about the rows appended later
+        declared = self.column_types.get(self.columns[index])
+        if declared is not None:
+            return declared
+        kinds = {_type_name(row[index]) for row in self.buffer if row[index] is not None}
+        return 'str' if 'str' in kinds else 'float'
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
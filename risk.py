@@ -35,4 +35,193 @@ def max_gain_risk(voter_strategic_gains):
 ## using proportion of voters with incentive to vote strategically as an indicator for risk
 def incentive_based_risk(voter_strategic_gains):
     voter_strategic_gains = np.asarray(voter_strategic_gains)
-    return np.count_nonzero(voter_strategic_gains) / len(voter_strategic_gains)
\ No newline at end of file
+    return np.count_nonzero(voter_strategic_gains) / len(voter_strategic_gains)
+
+## streaming counterparts of the risk functions above, for gains arriving in chunks (many voters or trials).
+## StreamingRisk.update takes any chunk of gains, merge combines the states of several workers; counts,
+## sums and the max are exact, percentiles come from a t-digest (see TDigest for its error bound)
+class TDigest:
+    """
+    Merging t-digest: a bounded set of weighted centroids summarizing a stream of values.
+    Centroids are merged under the arcsine scale function k(q) = compression / (2 pi) * asin(2q - 1), so
+    each centroid covers at most one unit of k: at most ~compression / 2 centroids, with small centroids
+    near the tails. Quantiles interpolate between centroid centers; the rank error of quantile(q) is
+    below about pi * sqrt(q * (1 - q)) / compression of the total count (~1.4% at the quartiles for
+    compression=100); min and max are exact, and so is everything for up to compression / pi values.
+    """
+    def __init__(self, compression=100):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer = []
+        self._buffered = 0
+
+    @property
+    def count(self):
+        self._compress()
+        return float(np.sum(self.weights))
+
+    def update(self, values, weights=None):
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return self
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=float).ravel()
+        self.min = min(self.min, float(np.min(values)))
+        self.max = max(self.max, float(np.max(values)))
+        self._buffer.append((values, weights))
+        self._buffered += len(values)
+        if self._buffered > 10 * self.compression:
+            self._compress()
+        return self
+
+    def merge(self, other):
+        other._compress()
+        if len(other.means):
+            self.update(other.means, other.weights)
+            self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        return self
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        means = np.concatenate([self.means] + [values for values, _ in self._buffer])
+        weights = np.concatenate([self.weights] + [weights for _, weights in self._buffer])
+        self._buffer, self._buffered = [], 0
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        # k-unit of every point's cumulative position; the points of one unit become one centroid
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        unit = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)).astype(np.int64)
+        _, group = np.unique(unit, return_inverse=True)
+        group = group.ravel()
+        self.weights = np.bincount(group, weights=weights)
+        self.means = np.bincount(group, weights=means * weights) / self.weights
+
+    def quantile(self, q):
+        """Approximate value at quantile q in [0, 1], interpolated like np.percentile (linear)."""
+        self._compress()
+        if len(self.means) == 0:
+            return math.nan
+        total = np.sum(self.weights)
+        # np.percentile puts quantile q at sorted index q * (n - 1); a value of index j is centered at j + 1/2
+        target = q * (total - 1) + 0.5
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate(([0.5], centers, [total - 0.5]))
+        values = np.concatenate(([self.min], self.means, [self.max]))
+        return float(np.interp(target, positions, values))
+
+
+class StreamingRisk:
+    """Running state behind the four risk measures; update with gains in chunks, merge across workers."""
+    def __init__(self, compression=100):
+        self.count = 0
+        self.num_gainers = 0
+        self.gain_sum = 0.0
+        self.max_gain = -math.inf
+        self.all_gains = TDigest(compression)
+        self.gainers = TDigest(compression)
+
+    def update(self, voter_strategic_gains):
+        voter_strategic_gains = np.asarray(voter_strategic_gains, dtype=float).ravel()
+        if len(voter_strategic_gains) == 0:
+            return self
+        non_zero_gains = voter_strategic_gains[voter_strategic_gains != 0]
+        self.count += len(voter_strategic_gains)
+        self.num_gainers += len(non_zero_gains)
+        self.gain_sum += float(np.sum(non_zero_gains))
+        self.max_gain = max(self.max_gain, float(np.max(voter_strategic_gains)))
+        self.all_gains.update(voter_strategic_gains)
+        self.gainers.update(non_zero_gains)
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.num_gainers += other.num_gainers
+        self.gain_sum += other.gain_sum
+        self.max_gain = max(self.max_gain, other.max_gain)
+        self.all_gains.merge(other.all_gains)
+        self.gainers.merge(other.gainers)
+        return self
+
+    def average_gain_risk(self, only_consider_gainers=True):
+        if self.num_gainers == 0:
+            return 0
+        return self.gain_sum / (self.num_gainers if only_consider_gainers else self.count)
+
+    def gain_percentile_risk(self, percentile=75, only_consider_gainers=True):
+        if self.num_gainers == 0:
+            return 0
+        digest = self.gainers if only_consider_gainers else self.all_gains
+        return digest.quantile(percentile / 100)
+
+    def max_gain_risk(self):
+        return self.max_gain
+
+    def incentive_based_risk(self):
+        return self.num_gainers / self.count
+
+
+## batched risk functions: `voter_strategic_gains` holds one row of gains per trial (trials x voters) and every
+## measure is reduced along `axis`, giving one value per trial. NaN entries are absent voters, so trials with
+## electorates of different sizes can share one array (padded with NaN)
+def _gain_masks(voter_strategic_gains):
+    voter_strategic_gains = np.asarray(voter_strategic_gains, dtype=float)
+    present = ~np.isnan(voter_strategic_gains)
+    return voter_strategic_gains, present, present & (voter_strategic_gains != 0)
+
+def batch_average_gain_risk(voter_strategic_gains, only_consider_gainers=True, axis=-1):
+    voter_strategic_gains, present, gainers = _gain_masks(voter_strategic_gains)
+    total = np.sum(np.where(gainers, voter_strategic_gains, 0), axis=axis)
+    num_gainers = np.sum(gainers, axis=axis)
+    denominator = num_gainers if only_consider_gainers else np.sum(present, axis=axis)
+    return np.where(num_gainers > 0, total / np.maximum(denominator, 1), 0)
+
+def batch_gain_percentile_risk(voter_strategic_gains, percentile=75, only_consider_gainers=True, axis=-1):
+    voter_strategic_gains, present, gainers = _gain_masks(voter_strategic_gains)
+    considered = np.where(gainers if only_consider_gainers else present, voter_strategic_gains, np.nan)
+    any_gainer = np.any(gainers, axis=axis)
+    # rows without gainers are all-NaN when only gainers count; fill them so nanpercentile stays quiet
+    considered = np.where(np.expand_dims(any_gainer, axis), considered, 0)
+    return np.where(any_gainer, np.nanpercentile(considered, percentile, axis=axis), 0)
+
+def batch_max_gain_risk(voter_strategic_gains, axis=-1):
+    voter_strategic_gains, present, _ = _gain_masks(voter_strategic_gains)
+    return np.max(np.where(present, voter_strategic_gains, -np.inf), axis=axis)
+
+def batch_incentive_based_risk(voter_strategic_gains, axis=-1):
+    _, present, gainers = _gain_masks(voter_strategic_gains)
+    return np.sum(gainers, axis=axis) / np.sum(present, axis=axis)
+
+BATCH_RISK_FUNCTIONS = {
+    'average_gain_risk': batch_average_gain_risk,
+    'gain_percentile_risk': batch_gain_percentile_risk,
+    'max_gain_risk': batch_max_gain_risk,
+    'incentive_based_risk': batch_incentive_based_risk,
+}
+
+## bootstrap confidence interval of the mean over trials of a per-trial risk value: the trials are resampled
+## with replacement num_resamples times at once (one index matrix), the values are computed only once
+def bootstrap_interval(trial_values, num_resamples=1000, confidence=0.95, rng=None):
+    trial_values = np.asarray(trial_values, dtype=float)
+    rng = np.random.default_rng(rng)
+    resamples = rng.integers(0, len(trial_values), size=(num_resamples, len(trial_values)))
+    means = np.mean(trial_values[resamples], axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(means, [alpha, 1 - alpha])
+    return {'mean': np.mean(trial_values), 'ci_low': low, 'ci_high': high}
+
+## every risk measure of a trials x voters gain array as mean over trials with its bootstrap interval
+def risk_table(voter_strategic_gains, percentile=75, only_consider_gainers=True, num_resamples=1000,
+               confidence=0.95, rng=None):
+    rng = np.random.default_rng(rng)
+    options = {
+        'average_gain_risk': {'only_consider_gainers': only_consider_gainers},
+        'gain_percentile_risk': {'percentile': percentile, 'only_consider_gainers': only_consider_gainers},
+    }
+    return {
+        name: bootstrap_interval(function(voter_strategic_gains, **options.get(name, {})), num_resamples, confidence, rng)
+        for name, function in BATCH_RISK_FUNCTIONS.items()
+    }
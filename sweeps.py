@@ -0,0 +1,226 @@
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics import NormalDist
+
+import numpy as np
+
+# Declarative parameter sweeps.
+# A sweep is a trial function, a list of voting schemes, a grid of parameters and a number of trials.
+# Every (scheme, parameters, trial) cell is stored on disk under a hash of its content as soon as it
+# finishes, so an interrupted sweep picks up where it stopped and a repeated sweep is read back.
+# Each cell draws its randomness from its own RNG seeded by that hash, so results do not depend on
+# the order (or the process) in which cells run.
+# In paired mode (common random numbers) a cell is (parameters, trial): the trial function gets all
+# schemes at once and evaluates them on the same profile, so scheme comparisons can use paired
+# differences instead of differences of independent means.
+
+
+def grid(**axes):
+    """Cartesian product of the given axes as a list of parameter dicts, e.g. grid(num_voters=[5, 10], noise_level=[0.1])."""
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+
+def _plain(value):
+    # JSON-safe copy of parameters and outcomes (NumPy scalars become Python numbers)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def cell_key(trial_function, voting_scheme, params, trial, seed):
+    """Content hash identifying one cell; changing any parameter (or the seed) gives a new cell."""
+    content = {
+        'function': f"{trial_function.__module__}.{trial_function.__qualname__}",
+        'voting_scheme': voting_scheme,
+        'params': _plain(params),
+        'trial': trial,
+        'seed': seed,
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], key + '.json')
+
+
+def _load_cell(cache_dir, key):
+    path = _cache_path(cache_dir, key)
+    if not os.path.isfile(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+
+def _store_cell(cache_dir, key, outcome):
+    path = _cache_path(cache_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # write-then-rename, so a crash never leaves a half-written cell behind
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'w') as file:
+        json.dump(outcome, file)
+    os.replace(temporary_path, path)
+
+
+def _run_cell(cell):
+    trial_function, scheme_argument, params, key = cell
+    rng = np.random.default_rng(int(key, 16))
+    return _plain(trial_function(**scheme_argument, rng=rng, **params))
+
+
+def run_sweep(trial_function, voting_schemes, param_grid, trials=10, seed=0, cache_dir='.sweep_cache',
+              processes=None, results_sink=None, paired=False):
+    """
+    Run trial_function for every voting scheme, parameter dict in param_grid and trial.
+
+    trial_function(voting_scheme=..., rng=..., **params) must be a module-level function (so it can
+    be sent to worker processes) returning a dict of numbers. With paired=True it is called once per
+    (parameters, trial) as trial_function(voting_schemes=[...], rng=..., **params) and returns
+    {voting_scheme: dict of numbers}. Instead of one dict, a trial may return a list of dicts (several
+    rows, e.g. one per noise level of a nested mask); their entries override the parameters.
+    Cells already in cache_dir are not run again; cache_dir=None disables the cache. processes=1 runs
+    everything in this process. Rows are written to results_sink (if any) as cells complete; cells read
+    back from the cache are not written again, since they went to the sink in the run that computed them
+    (unless the sink holds no rows yet, e.g. a new results file for a cached sweep). With a sink, a cell
+    is only stored in the cache once its rows have been flushed to the results file, so a sweep killed
+    with rows still buffered recomputes (and writes) those cells when it is resumed.
+
+    Returns one dict per scheme and cell, {'voting_scheme', **params, 'trial', **outcome}, in grid order.
+    """
+    if paired:
+        schemes = list(voting_schemes)
+        cells = [(schemes, params, trial) for params in param_grid for trial in range(trials)]
+    else:
+        cells = [
+            (voting_scheme, params, trial)
+            for voting_scheme in voting_schemes
+            for params in param_grid
+            for trial in range(trials)
+        ]
+    keys = [cell_key(trial_function, scheme, params, trial, seed) for scheme, params, trial in cells]
+    outcomes = [None] * len(cells)
+
+    def per_scheme(index, outcome):
+        scheme, params, trial = cells[index]
+        if paired:
+            return [(voting_scheme, params, trial, outcome[voting_scheme]) for voting_scheme in scheme]
+        return [(scheme, params, trial, outcome)]
+
+    def cell_rows(index, outcome):
+        for voting_scheme, params, trial, values in per_scheme(index, outcome):
+            for row_values in (values if isinstance(values, list) else [values]):
+                yield {'voting_scheme': voting_scheme, **params, 'trial': trial, **row_values}
+
+    write_cached = results_sink is not None and not results_sink.has_rows()
+    pending = []
+    for index, key in enumerate(keys):
+        cached = _load_cell(cache_dir, key) if cache_dir is not None else None
+        if cached is not None:
+            outcomes[index] = cached
+            if write_cached:
+                for row in cell_rows(index, cached):
+                    results_sink.write(**row, seed=seed)
+        else:
+            pending.append(index)
+
+    # cells whose rows are still in the sink's buffer; cached once the buffer is written out
+    unflushed = []
+
+    def store_flushed():
+        if cache_dir is not None:
+            for index in unflushed:
+                _store_cell(cache_dir, keys[index], outcomes[index])
+        unflushed.clear()
+
+    def complete(index, outcome):
+        outcomes[index] = outcome
+        unflushed.append(index)
+        if results_sink is not None:
+            rows_written = results_sink.rows_written
+            for row in cell_rows(index, outcome):
+                results_sink.write(**row, seed=seed)
+            if results_sink.rows_written != rows_written:
+                # the buffer filled up within this cell: write the rest too, never half a cell
+                results_sink.flush()
+            if results_sink.buffer:
+                return
+        store_flushed()
+
+    scheme_name = 'voting_schemes' if paired else 'voting_scheme'
+    tasks = {
+        index: (trial_function, {scheme_name: cells[index][0]}, cells[index][1], keys[index])
+        for index in pending
+    }
+    try:
+        if processes == 1:
+            for index, task in tasks.items():
+                complete(index, _run_cell(task))
+        elif tasks:
+            with ProcessPoolExecutor(max_workers=processes or os.cpu_count()) as executor:
+                futures = {executor.submit(_run_cell, task): index for index, task in tasks.items()}
+                for future in as_completed(futures):
+                    complete(futures[future], future.result())
+    finally:
+        # also on an exception: the finished cells are written out and cached together
+        if results_sink is not None:
+            results_sink.flush()
+        store_flushed()
+
+    rows = [row for index, outcome in enumerate(outcomes) for row in cell_rows(index, outcome)]
+    if paired:
+        # same order as the unpaired sweep: scheme, then parameters, then trial
+        rows.sort(key=lambda row: schemes.index(row['voting_scheme']))
+    return rows
+
+
+def average_by(rows, keys, values):
+    """Mean of each of `values` over the rows sharing the same `keys`, in first-seen order."""
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(row[key] for key in keys), []).append(row)
+    return [
+        {**dict(zip(keys, group)), **{value: np.mean([row[value] for row in members]) for value in values}}
+        for group, members in groups.items()
+    ]
+
+
+def paired_differences(rows, keys, value, baseline, confidence=0.95):
+    """
+    Mean difference of `value` between every scheme and the `baseline` scheme over the trials they
+    share, per group of `keys` (rows from a paired sweep). Each trial contributes one difference,
+    so the profile-to-profile noise cancels. Trials where either value is NaN are left out.
+    Returns dicts with the group keys, 'voting_scheme', 'mean', 'std', 'ci_low', 'ci_high' and 'num_pairs'.
+    """
+    by_trial = {}
+    for row in rows:
+        group = tuple(row[key] for key in keys)
+        by_trial.setdefault(group, {}).setdefault(row['trial'], {})[row['voting_scheme']] = row[value]
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    summaries = []
+    for group, trials in by_trial.items():
+        schemes = [scheme for scheme in next(iter(trials.values())) if scheme != baseline]
+        for scheme in schemes:
+            differences = np.array([
+                values[scheme] - values[baseline] for values in trials.values()
+                if scheme in values and baseline in values
+            ], dtype=float)
+            differences = differences[~np.isnan(differences)]
+            num_pairs = len(differences)
+            mean = np.mean(differences) if num_pairs else np.nan
+            std = np.std(differences, ddof=1) if num_pairs > 1 else np.nan
+            half_width = z * std / np.sqrt(num_pairs) if num_pairs > 1 else np.nan
+            summaries.append({
+                **dict(zip(keys, group)), 'voting_scheme': scheme, 'mean': mean, 'std': std,
+                'ci_low': mean - half_width, 'ci_high': mean + half_width, 'num_pairs': num_pairs,
+            })
+    return summaries
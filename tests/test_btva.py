@@ -0,0 +1,34 @@
+import numpy as np
+
+from b_borda import BBorda
+from happiness import distance_sensitive_happiness
+from instrumentation import Stats
+from profile_store import write_profile, open_profile
+from profiles import impartial_culture
+
+
+def strategic_search(preference_matrix, stats=None):
+    btva = BBorda(preference_matrix, distance_sensitive_happiness, stats=stats)
+    election_result = btva.run_non_strategic_election()
+    btva.non_strategic_happinesses = btva.calc_happinesses(election_result[0])
+    return btva.run_strategic_election(election_result)
+
+
+def test_strategy_search_on_a_memmap_copies_only_the_returned_scenarios(tmp_path):
+    preference_matrix = impartial_culture(5, 40, rng=11)
+    write_profile(str(tmp_path / 'profile.tva'), preference_matrix)
+    profile = open_profile(str(tmp_path / 'profile.tva'))
+
+    stats = Stats()
+    scenarios = strategic_search(profile, stats)
+    expected = strategic_search(preference_matrix)
+
+    strategic_voters = [voter for voter, scenario in enumerate(scenarios) if scenario]
+    assert strategic_voters == [voter for voter, scenario in enumerate(expected) if scenario]
+    assert sum(stats.counters[f'ballots_tried.{strategy}'] for strategy in ('bullet', 'compromise', 'bury')) > len(strategic_voters)
+    copied = sum(stats.counters[f'bytes_copied.{strategy}'] for strategy in ('bullet', 'compromise', 'bury'))
+    assert copied == len(strategic_voters) * profile.nbytes
+    for voter in strategic_voters:
+        np.testing.assert_array_equal(scenarios[voter]['strategic preference matrix'],
+                                      expected[voter]['strategic preference matrix'])
+        np.testing.assert_array_equal(scenarios[voter]['new votes'], expected[voter]['new votes'])
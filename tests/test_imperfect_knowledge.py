@@ -0,0 +1,41 @@
+import pytest
+
+import tracing
+from atva_imperfect_knowledge import BTVA_ImperfectInfo
+from ballots import UNKNOWN
+from profiles import impartial_culture
+
+
+@pytest.mark.parametrize('voting_scheme', ['plurality', 'borda', 'anti_plurality', 'voting_for_two'])
+@pytest.mark.parametrize('seed', range(6))
+@pytest.mark.parametrize('num_voters', [6, 8])
+def test_all_voters_analysis_matches_per_voter_analysis(voting_scheme, seed, num_voters):
+    # borda, 8 voters, seed 0: voter 7's best expected gain is 5.6e-17, rounding noise that must not count
+    preference_matrix = impartial_culture(5, num_voters, rng=seed)
+    all_voters = BTVA_ImperfectInfo(voting_scheme, preference_matrix, noise_level=0.3, rng=seed)
+    results = all_voters.run_all_voters_strategic_voting()
+
+    with tracing.quiet():
+        for voter in range(all_voters.num_voters):
+            single = BTVA_ImperfectInfo(
+                voting_scheme, preference_matrix, strategic_voter_idx=voter,
+                partial_pref_matrix=all_voters.partial_preference_matrix
+            )
+            incentives = single.run_strategic_voting(single.run_non_strategic_election())
+            strategic = results['best_strategy'][voter] != 'sincere'
+            assert bool(incentives[voter]) == strategic, f"voter {voter}"
+            assert results['probability_of_regret'][voter] == pytest.approx(single.risk_of_strategic_voting)
+            if strategic:
+                assert results['voter_strategic_gains'][voter] > 0
+
+
+def test_int64_partial_matrix_keeps_unknown_entries():
+    preference_matrix = impartial_culture(5, 6, rng=4)
+    compact = BTVA_ImperfectInfo('borda', preference_matrix, noise_level=0.3, rng=4)
+    wide = BTVA_ImperfectInfo('borda', preference_matrix, partial_pref_matrix=compact.partial_preference_matrix.astype('int64'))
+
+    assert (compact.partial_preference_matrix == UNKNOWN).any()
+    assert (wide.partial_preference_matrix == compact.partial_preference_matrix).all()
+    with tracing.quiet():
+        assert (wide.run_strategic_voting(wide.run_non_strategic_election())
+                == compact.run_strategic_voting(compact.run_non_strategic_election())).all()
@@ -0,0 +1,12 @@
+import numpy as np
+
+from large_electorate import synthetic_chunks, chunked_tally
+
+
+def test_synthetic_chunks_tally_the_same_electorate_every_time():
+    chunks = synthetic_chunks(5, 10_000, chunk_size=3_000, seed=7)
+    first = chunked_tally(chunks, 'borda', 5, threads=1)
+    second = chunked_tally(chunks, 'borda', 5, threads=2)
+    np.testing.assert_array_equal(first, second)
+    np.testing.assert_array_equal(first, chunked_tally(synthetic_chunks(5, 10_000, chunk_size=3_000, seed=7), 'borda', 5))
+
@@ -0,0 +1,23 @@
+from results_sink import ResultsSink, load_results, read_schema
+
+
+def test_int_literals_in_the_first_batch_do_not_freeze_a_float_column(tmp_path):
+    path = str(tmp_path / 'results.csv')
+    with ResultsSink(path, ['trial', 'risk'], buffer_size=2) as sink:
+        sink.write(trial=0, risk=0)
+        sink.write(trial=1, risk=0)
+        sink.write(trial=2, risk=0.25)
+
+    assert read_schema(path)['risk'] == 'float'
+    results = load_results(path)
+    assert list(results['risk']) == [0.0, 0.0, 0.25]
+
+
+def test_declared_column_types_are_written_to_the_schema(tmp_path):
+    path = str(tmp_path / 'results.csv')
+    with ResultsSink(path, {'trial': 'int', 'risk': 'float'}, metadata={'seed': 3}) as sink:
+        sink.write(voting_scheme='borda', num_voters=5, trial=0, risk=0)
+
+    schema = read_schema(path)
+    assert (schema['trial'], schema['risk'], schema['num_voters'], schema['seed']) == ('int', 'float', 'int', 'int')
+    assert load_results(path)['trial'].tolist() == [0]
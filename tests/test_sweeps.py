@@ -0,0 +1,81 @@
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+
+from results_sink import ResultsSink, load_results
+from sweeps import grid, run_sweep
+
+
+def uniform_trial(voting_scheme, rng, num_voters):
+    return {'value': float(rng.random())}
+
+
+def test_resumed_sweep_writes_each_row_once(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    path = tmp_path / 'results.csv'
+    schemes = ['plurality', 'borda']
+    params = grid(num_voters=[5, 10])
+    columns = {'trial': 'int', 'value': 'float'}
+
+    with ResultsSink(str(path), columns) as sink:
+        first = run_sweep(uniform_trial, schemes, params, trials=2, cache_dir=str(cache_dir), processes=1,
+                          results_sink=sink)
+    # resume with more trials: the first two trials come from the cache and must not be written again
+    with ResultsSink(str(path), columns) as sink:
+        resumed = run_sweep(uniform_trial, schemes, params, trials=3, cache_dir=str(cache_dir), processes=1,
+                            results_sink=sink)
+
+    assert len(first) == 8 and len(resumed) == 12
+    results = load_results(str(path))
+    assert len(results) == 12
+    assert not results.duplicated(['voting_scheme', 'num_voters', 'trial']).any()
+
+
+def test_sweep_killed_with_buffered_rows_resumes_without_losing_them(tmp_path, monkeypatch):
+    # the trial function lives in its own module so the killed run and the resumed one share cell keys;
+    # the first run is killed (SIGKILL, no cleanup) while computing the last parameter value
+    (tmp_path / 'killable_trial.py').write_text(textwrap.dedent("""
+        import os, signal
+
+        def trial(voting_scheme, rng, x):
+            if str(x) == os.environ.get('KILL_AT'):
+                os.kill(os.getpid(), signal.SIGKILL)
+            return {'value': float(rng.random())}
+    """))
+    script = tmp_path / 'killed_sweep.py'
+    script.write_text(textwrap.dedent(f"""
+        import sys
+        sys.path[:0] = [{str(tmp_path)!r}, {os.path.dirname(os.path.dirname(os.path.abspath(__file__)))!r}]
+        from killable_trial import trial
+        from results_sink import ResultsSink
+        from sweeps import grid, run_sweep
+
+        with ResultsSink(sys.argv[2], {{'x': 'int', 'trial': 'int', 'value': 'float'}}) as sink:
+            run_sweep(trial, ['borda'], grid(x=[1, 2, 3]), trials=2, cache_dir=sys.argv[1], processes=1,
+                      results_sink=sink)
+    """))
+    cache_dir, path = str(tmp_path / 'cache'), str(tmp_path / 'results.csv')
+    completed = subprocess.run([sys.executable, str(script), cache_dir, path], env={**os.environ, 'KILL_AT': '3'})
+    assert completed.returncode == -signal.SIGKILL
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    from killable_trial import trial
+    with ResultsSink(path, {'x': 'int', 'trial': 'int', 'value': 'float'}) as sink:
+        rows = run_sweep(trial, ['borda'], grid(x=[1, 2, 3]), trials=2, cache_dir=cache_dir, processes=1,
+                         results_sink=sink)
+
+    results = load_results(path)
+    assert len(rows) == 6 and len(results) == 6
+    assert not results.duplicated(['x', 'trial']).any()
+
+
+def test_cached_sweep_into_a_new_results_file_writes_every_row(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    run_sweep(uniform_trial, ['borda'], grid(num_voters=[5, 10]), trials=2, cache_dir=cache_dir, processes=1)
+    path = str(tmp_path / 'results.csv')
+    with ResultsSink(path, {'trial': 'int', 'value': 'float'}) as sink:
+        run_sweep(uniform_trial, ['borda'], grid(num_voters=[5, 10]), trials=2, cache_dir=cache_dir, processes=1,
+                  results_sink=sink)
+    assert len(load_results(path)) == 4
@@ -0,0 +1,124 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# Structured events for the analysis loops.
+# Code in hot loops emits events instead of printing; nothing is formatted unless a sink
+# actually wants the event, so a quiet tracer costs one comparison per call site.
+DEBUG = 10
+INFO = 20
+WARNING = 30
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING'}
+
+
+class NullSink:
+    """Discards every event."""
+    def write(self, level, event, message, fields):
+        pass
+
+    def close(self):
+        pass
+
+
+class ConsoleSink:
+    """
+    Prints events like the analysis scripts used to. If an event carries a message
+    (a format template, or a callable taking the fields as keywords) it is rendered with the
+    event fields, otherwise `event key=value ...` is printed.
+    """
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def write(self, level, event, message, fields):
+        stream = self.stream if self.stream is not None else sys.stdout
+        if callable(message):
+            text = message(**fields)
+        elif message is not None:
+            text = message.format(**fields)
+        else:
+            text = event + ''.join(f" {key}={value}" for key, value in fields.items())
+        print(text, file=stream)
+
+    def close(self):
+        pass
+
+
+class JsonLinesSink:
+    """Appends one JSON object per event to a file; NumPy arrays and scalars are stored as lists/numbers."""
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'a')
+
+    def write(self, level, event, message, fields):
+        record = {'time': time.time(), 'level': LEVEL_NAMES.get(level, level), 'event': event}
+        record.update(fields)
+        self.file.write(json.dumps(record, default=_to_json) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class Tracer:
+    def __init__(self, sink=None, level=INFO):
+        self.sink = sink if sink is not None else NullSink()
+        self.level = level
+
+    def enabled_for(self, level):
+        """Guard for call sites that would have to build expensive fields (e.g. matrix copies)."""
+        return level >= self.level and not isinstance(self.sink, NullSink)
+
+    def emit(self, level, event, message=None, **fields):
+        # fields are passed through untouched; only the sink decides whether to format them
+        if level < self.level or isinstance(self.sink, NullSink):
+            return
+        self.sink.write(level, event, message, fields)
+
+    def debug(self, event, message=None, **fields):
+        self.emit(DEBUG, event, message, **fields)
+
+    def info(self, event, message=None, **fields):
+        self.emit(INFO, event, message, **fields)
+
+    def warning(self, event, message=None, **fields):
+        self.emit(WARNING, event, message, **fields)
+
+
+# interactive default: summaries on the console, per-iteration dumps only at DEBUG
+_default_tracer = Tracer(ConsoleSink(), INFO)
+NULL_TRACER = Tracer(NullSink())
+
+
+def get_tracer():
+    return _default_tracer
+
+
+def set_tracer(tracer):
+    global _default_tracer
+    previous = _default_tracer
+    _default_tracer = tracer
+    return previous
+
+
+@contextmanager
+def use_tracer(tracer):
+    previous = set_tracer(tracer)
+    try:
+        yield tracer
+    finally:
+        set_tracer(previous)
+
+
+def quiet():
+    """Batch mode: no event is formatted or written."""
+    return use_tracer(NULL_TRACER)